@@ -1,25 +1,57 @@
 import numpy as np
-import pygame
 import neat
 from config import *
-from collections import deque
+from world import AgentState
+
+def _state_field(name):
+    """Property that reads and writes this agent's slot in the shared AgentState"""
+    def get(self):
+        return getattr(self.state, name)[self.index]
+
+    def set(self, value):
+        getattr(self.state, name)[self.index] = value
+
+    return property(get, set)
 
 class Agent:
-    def __init__(self, x, y, genome, config, is_predator=False):
-        self.x = x
-        self.y = y
-        self.radius = PREDATOR_RADIUS if is_predator else AGENT_RADIUS
-        self.energy = PREDATOR_ENERGY if is_predator else AGENT_ENERGY
-        self.speed = PREDATOR_SPEED if is_predator else AGENT_SPEED
+    x = _state_field('x')
+    y = _state_field('y')
+    angle = _state_field('angle')
+    speed = _state_field('speed')
+    energy = _state_field('energy')
+    fitness = _state_field('fitness')
+    radius = _state_field('radius')
+    memory = _state_field('memory')
+
+    def __init__(self, x, y, genome, config, is_predator=False, state=None, index=0):
+        # Agents are thin views over a slot in an AgentState owned by the world
+        self.state = state if state is not None else AgentState(1)
+        self.index = index
+        self.state.init_agent(index, x, y, is_predator)
         self.genome = genome
-        self.net = neat.nn.FeedForwardNetwork.create(genome, config)
-        self.fitness = 0
-        self.alive = True
-        self.angle = 0
+        self.config = config
+        self._net = None
         self.is_predator = is_predator
-        self.memory = deque(maxlen=MEMORY_SIZE)
-        for _ in range(MEMORY_SIZE):
-            self.memory.append(0)  # Initialize memory with zeros
+
+    @property
+    def net(self):
+        # The simulation runs the batched network; this one is only built if asked for
+        if self._net is None:
+            self._net = neat.nn.FeedForwardNetwork.create(self.genome, self.config)
+        return self._net
+
+    @property
+    def alive(self):
+        return bool(self.state.alive[self.index])
+
+    @alive.setter
+    def alive(self, value):
+        self.state.alive[self.index] = value
+        # The active set only drops the dead by itself; a revival rebuilds it
+        if value:
+            self.state.reindex()
+        else:
+            self.state.compact()
 
     def get_vision_inputs(self, foods, agents):
         """Get inputs from vision cone"""
@@ -109,41 +141,28 @@ class Agent:
         
         return inputs
 
+    def get_outputs(self, foods, agents):
+        """Run the neural network on the current environment state"""
+        return self.net.activate(self.get_inputs(foods, agents))
+
     def update(self, foods, agents):
         """Update agent state based on neural network output"""
         if not self.alive:
             return
 
-        # Get neural network inputs
-        inputs = self.get_inputs(foods, agents)
-        
-        # Get neural network output
-        output = self.net.activate(inputs)
-        
-        # Update memory with current action
-        self.memory.append(output[0])  # Store turning decision
-        
-        # Update movement
-        self.angle += (output[0] - 0.5) * np.pi
-        self.speed = output[1] * (PREDATOR_SPEED if self.is_predator else AGENT_SPEED)
-        
-        # Update position
-        self.x += np.cos(self.angle) * self.speed
-        self.y += np.sin(self.angle) * self.speed
-        
-        # Keep agent within bounds
-        self.x = np.clip(self.x, self.radius, WINDOW_WIDTH - self.radius)
-        self.y = np.clip(self.y, self.radius, WINDOW_HEIGHT - self.radius)
-        
-        # Decrease energy
-        self.energy -= ENERGY_DECAY
-        
-        # Check if agent is dead
-        if self.energy <= 0:
-            self.alive = False
+        # Move just this agent through the batched state update
+        outputs = np.zeros((self.state.size, NUM_OUTPUTS))
+        outputs[self.index] = self.get_outputs(foods, agents)
+        active = np.zeros(self.state.size, dtype=bool)
+        active[self.index] = True
+        self.state.step(outputs, active)
+        # A starved agent leaves the active set, as in Simulation.tick
+        self.state.compact()
 
     def draw(self, screen):
         """Draw the agent on the screen"""
+        import pygame
+
         if not self.alive:
             return
 
@@ -0,0 +1,186 @@
+import numpy as np
+from neat.graphs import feed_forward_layers
+
+# NumPy versions of neat-python's built-in activation functions
+ACTIVATIONS = {
+    'sigmoid': lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    'tanh': lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    'sin': lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    'gauss': lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4)**2),
+    'relu': lambda z: np.where(z > 0.0, z, 0.0),
+    'softplus': lambda z: 0.2 * np.log(1 + np.exp(np.clip(5.0 * z, -60.0, 60.0))),
+    'identity': lambda z: z,
+    'clamped': lambda z: np.clip(z, -1.0, 1.0),
+    'exp': lambda z: np.exp(np.clip(z, -60.0, 60.0)),
+    'abs': np.abs,
+    'hat': lambda z: np.maximum(0.0, 1 - np.abs(z)),
+    'square': lambda z: z**2,
+    'cube': lambda z: z**3,
+}
+
+# Codes of the activation functions, as stored in compiled networks
+ACTIVATION_CODES = {name: code for code, name in enumerate(ACTIVATIONS)}
+ACTIVATION_FUNCTIONS = list(ACTIVATIONS.values())
+
+NODE_DTYPE = np.dtype([
+    ('depth', np.int32),
+    ('row', np.int32),
+    ('slot', np.int32),
+    ('bias', np.float64),
+    ('response', np.float64),
+    ('activation', np.int32),
+])
+LINK_DTYPE = np.dtype([
+    ('depth', np.int32),
+    ('row', np.int32),
+    ('source', np.int32),
+    ('weight', np.float64),
+])
+
+def join_records(arrays, dtype):
+    """Concatenation of many small record arrays of one dtype
+
+    np.concatenate promotes the fields of every structured array it is
+    given, which dominates for a generation of tiny per-genome tables;
+    joining the raw bytes skips that.
+    """
+    return np.frombuffer(b''.join([array.tobytes() for array in arrays]), dtype)
+
+def compile_genome(genome, genome_config):
+    """Slot count plus node and link records for one genome
+
+    Nodes are NODE_DTYPE records, one per evaluated node, giving its
+    topological depth, its row within that depth and its value slot. Links
+    are LINK_DTYPE records, one per incoming connection, addressed by the
+    depth and row of the node they feed. BatchNetwork concatenates these
+    records for a whole generation and scatters them in one go.
+    """
+    num_inputs = len(genome_config.input_keys)
+    connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+    layers = feed_forward_layers(genome_config.input_keys, genome_config.output_keys, connections)
+
+    slots = {key: i for i, key in enumerate(genome_config.input_keys)}
+    for i, key in enumerate(genome_config.output_keys):
+        slots[key] = num_inputs + i
+    place = {}
+    node_rows = []
+    for depth, layer in enumerate(layers):
+        for row, node in enumerate(sorted(layer)):
+            ng = genome.nodes[node]
+            if ng.aggregation != 'sum':
+                raise ValueError(f"Unsupported aggregation for batched networks: {ng.aggregation}")
+            if ng.activation not in ACTIVATION_CODES:
+                raise ValueError(f"Unsupported activation for batched networks: {ng.activation}")
+            if node not in slots:
+                slots[node] = len(slots)
+            place[node] = (depth, row)
+            node_rows.append((depth, row, slots[node], ng.bias, ng.response,
+                              ACTIVATION_CODES[ng.activation]))
+    link_rows = [place[o] + (slots[i], genome.connections[(i, o)].weight)
+                 for i, o in connections if o in place]
+    return len(slots), np.array(node_rows, NODE_DTYPE), np.array(link_rows, LINK_DTYPE)
+
+class BatchNetwork:
+    """A whole generation of feed-forward genomes evaluated together
+
+    Every genome gets a row of value slots (inputs, outputs, then hidden
+    nodes). Nodes are grouped by topological depth, and each depth is a
+    padded (genomes x nodes x slots) weight tensor, so one activation of the
+    population is a handful of batched matmuls. Outputs match
+    neat.nn.FeedForwardNetwork.activate up to float rounding.
+
+    With a NetworkCache, genomes already compiled in an earlier generation
+    are taken from it instead of being compiled again.
+    """
+
+    def __init__(self, genomes, config, cache=None):
+        genome_config = config.genome_config
+        self.num_inputs = len(genome_config.input_keys)
+        self.num_outputs = len(genome_config.output_keys)
+        self.size = len(genomes)
+
+        if cache is not None:
+            compiled = cache.compile_all(genomes)
+        else:
+            compiled = [compile_genome(genome, genome_config) for genome in genomes]
+        num_slots = max([self.num_inputs + self.num_outputs] + [slots for slots, _, _ in compiled])
+        self.scratch = num_slots  # Padded rows write here; nothing reads it
+        self.num_slots = num_slots + 1
+
+        nodes = join_records([nodes for _, nodes, _ in compiled], NODE_DTYPE)
+        links = join_records([links for _, _, links in compiled], LINK_DTYPE)
+        node_genome = np.repeat(np.arange(self.size), [len(nodes) for _, nodes, _ in compiled])
+        link_genome = np.repeat(np.arange(self.size), [len(links) for _, _, links in compiled])
+        depth = nodes['depth'].max(initial=-1) + 1
+        widths = np.zeros(depth, dtype=int)
+        np.maximum.at(widths, nodes['depth'], nodes['row'] + 1)
+
+        # Only the activation functions in use, coded densely
+        codes, activation = np.unique(nodes['activation'], return_inverse=True)
+        self.functions = [ACTIVATION_FUNCTIONS[code] for code in codes]
+
+        self.weights = []
+        self.bias = []
+        self.response = []
+        self.activation = []
+        self.target = []
+        for d, width in enumerate(widths):
+            n = nodes['depth'] == d
+            genome, row = node_genome[n], nodes['row'][n]
+            weights = np.zeros((self.size, width, self.num_slots))
+            bias = np.zeros((self.size, width))
+            response = np.zeros((self.size, width))
+            codes = np.zeros((self.size, width), dtype=int)
+            target = np.full((self.size, width), self.scratch)
+            target[genome, row] = nodes['slot'][n]
+            bias[genome, row] = nodes['bias'][n]
+            response[genome, row] = nodes['response'][n]
+            codes[genome, row] = activation[n]
+            l = links['depth'] == d
+            weights[link_genome[l], links['row'][l], links['source'][l]] = links['weight'][l]
+            self.weights.append(weights)
+            self.bias.append(bias)
+            self.response.append(response)
+            self.activation.append(codes)
+            self.target.append(target)
+        self.gathered = (None, None)
+
+    def layers(self, rows=None):
+        """Per-depth (weights, bias, response, activation, target) tensors
+
+        With `rows`, the tensors are restricted to those genomes. The copies
+        are kept and reused for as long as the same rows are asked for, so
+        they are only gathered again after the active set changes.
+        """
+        layers = zip(self.weights, self.bias, self.response, self.activation, self.target)
+        if rows is None:
+            return layers
+        cached_rows, gathered = self.gathered
+        if cached_rows is not None and (rows is cached_rows or (
+                len(rows) == len(cached_rows) and np.array_equal(rows, cached_rows))):
+            return gathered
+        gathered = [tuple(tensor[rows] for tensor in layer) for layer in layers]
+        self.gathered = (rows, gathered)
+        return gathered
+
+    def activate(self, inputs, rows=None):
+        """Outputs (genomes x outputs) for an inputs matrix (genomes x inputs)
+
+        `rows` optionally selects which genomes to evaluate; `inputs` then has
+        one row per selected genome.
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        values = np.zeros((len(inputs), self.num_slots))
+        values[:, :self.num_inputs] = inputs
+        genome_rows = np.arange(len(inputs))[:, None]
+        for weights, bias, response, activation, target in self.layers(rows):
+            z = bias + response * np.matmul(weights, values[:, :, None])[:, :, 0]
+            if len(self.functions) == 1:
+                out = self.functions[0](z)
+            else:
+                out = np.zeros_like(z)
+                for i, function in enumerate(self.functions):
+                    use = activation == i
+                    out[use] = function(z[use])
+            values[genome_rows, target] = out
+        return values[:, self.num_inputs:self.num_inputs + self.num_outputs]
@@ -0,0 +1,63 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(ROOT, 'config.txt')
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+def apply_overrides(overrides):
+    """Override config.py constants; must run before the simulation modules are imported"""
+    import config
+    for name, value in overrides.items():
+        if name != 'pop_size':
+            setattr(config, name, value)
+
+def load_bench_config(pop_size=None):
+    """NEAT config with an optional pop_size override"""
+    from simulation import load_config
+    neat_config = load_config(CONFIG_PATH)
+    if pop_size is not None:
+        neat_config.pop_size = pop_size
+    return neat_config
+
+def peak_memory_mb():
+    """Peak resident memory of this process in MB, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_results(path, kind, results):
+    """Write benchmark results plus run metadata as JSON"""
+    import numpy as np
+    report = {
+        'kind': kind,
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {path}")
@@ -0,0 +1,44 @@
+"""
+Compare two benchmark JSON files, e.g. from two commits.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import json
+import argparse
+
+def key(result):
+    """Identify the same measurement across files"""
+    if 'name' in result:
+        return result['name']
+    return json.dumps(result['case'], sort_keys=True)
+
+def metric(result):
+    """(value, higher_is_better) for a result"""
+    if 'ticks_per_sec' in result:
+        return result['ticks_per_sec'], True
+    return result['median_ms'], False
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = {key(r): r for r in json.load(f)['results']}
+    with open(args.after) as f:
+        after = json.load(f)['results']
+
+    for result in after:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        new_value, higher_is_better = metric(result)
+        old_value, _ = metric(old)
+        if not old_value or new_value is None:
+            continue
+        speedup = new_value / old_value if higher_is_better else old_value / new_value
+        print(f"{key(result):60s} {old_value:10.3f} -> {new_value:10.3f}   {speedup:5.2f}x")
+
+if __name__ == "__main__":
+    main()
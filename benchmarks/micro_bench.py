@@ -0,0 +1,126 @@
+"""
+Micro-benchmarks for the hot spots of a simulation tick and of generation
+turnover: sensing, network activation, Environment.update, reproduction and
+building the batched networks of a generation, plus opening and sampling a
+hall-of-fame archive.
+
+    python -m benchmarks.micro_bench --pop-size 200 --output bench_micro.json
+"""
+import time
+import argparse
+import tempfile
+import numpy as np
+from benchmarks.common import apply_overrides, load_bench_config, write_results
+
+def timed(func, repeat):
+    """Per-call wall times of `func` in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+def summarize(name, times, **extra):
+    result = {'name': name, 'calls': len(times),
+              'best_ms': min(times) * 1000, 'median_ms': float(np.median(times)) * 1000}
+    result.update(extra)
+    print(f"{name:32s} best {result['best_ms']:9.3f} ms   median {result['median_ms']:9.3f} ms")
+    return result
+
+def run(pop_size, seed, repeat, warmup_ticks, archive_size=5000):
+    from simulation import Simulation
+    from sensing import sense
+
+    sim = Simulation(load_bench_config(pop_size), seed=seed)
+    # Let the population spread out so the state isn't the spawn layout
+    for _ in range(warmup_ticks):
+        sim.tick()
+    agents = sim.agents
+    env = sim.environment
+    alive = [a for a in agents if a.alive]
+    rows = np.flatnonzero(sim.state.alive)
+    inputs = sense(sim.state, env.food_positions(), env.food_grid)
+    extra = {'pop_size': pop_size, 'alive': len(alive)}
+
+    results = []
+    results.append(summarize('get_inputs (per agent)', timed(
+        lambda: [a.get_inputs(env.foods, agents) for a in alive], repeat), **extra))
+    results.append(summarize('sense (batched)', timed(
+        lambda: sense(sim.state, env.food_positions(), env.food_grid), repeat), **extra))
+    results.append(summarize('net.activate (per agent)', timed(
+        lambda: [a.net.activate(inputs[a.index].tolist()) for a in alive], repeat), **extra))
+    results.append(summarize('BatchNetwork.activate', timed(
+        lambda: sim.networks.activate(inputs[rows], rows), repeat), **extra))
+
+    # Eats and respawns food in place, so repeated calls see a steady state
+    results.append(summarize('Environment.update', timed(
+        lambda: env.update(sim.state), repeat), **extra))
+
+    def reproduce():
+        sim.state.fitness[:] = np.random.rand(sim.state.size) * 10
+        sim.next_generation()
+    results.append(summarize('next_generation (reproduction)',
+                             timed(reproduce, max(1, repeat // 10)), **extra))
+    results += turnover_bench(sim, repeat)
+    results += hall_of_fame_bench(sim, archive_size, repeat)
+    return results
+
+def turnover_bench(sim, repeat):
+    """Build a generation's BatchNetwork from a warm cache, a cold one and no cache"""
+    from batch_nn import BatchNetwork
+    from network_cache import NetworkCache
+
+    genomes = [a.genome for a in sim.agents]
+    extra = {'genomes': len(genomes)}
+    # Large enough to hold the generation, as between two real generations
+    warm = NetworkCache(sim.config, capacity=2 * len(genomes))
+    BatchNetwork(genomes, sim.config, warm)
+    return [
+        summarize('cache lookup (warm)', timed(
+            lambda: warm.compile_all(genomes), repeat), **extra),
+        summarize('BatchNetwork build (warm cache)', timed(
+            lambda: BatchNetwork(genomes, sim.config, warm), repeat), **extra),
+        summarize('BatchNetwork build (cold cache)', timed(
+            lambda: BatchNetwork(genomes, sim.config, NetworkCache(sim.config)),
+            max(1, repeat // 10)), **extra),
+    ]
+
+def hall_of_fame_bench(sim, archive_size, repeat):
+    """Open an archive of `archive_size` genomes and rebuild 1000 sampled opponents"""
+    from hall_of_fame import HallOfFame
+
+    genomes = [a.genome for a in sim.population(False)]
+    fitness = list(range(len(genomes)))
+    extra = {'archive_size': archive_size}
+    with tempfile.TemporaryDirectory() as directory:
+        archive = HallOfFame(directory, sim.config, per_generation=len(genomes))
+        for generation in range(-(-archive_size // len(genomes))):
+            archive.add(generation, False, genomes, fitness)
+        return [
+            summarize('HallOfFame open', timed(
+                lambda: HallOfFame(directory, sim.config), repeat), **extra),
+            summarize('HallOfFame sample 1000', timed(
+                lambda: HallOfFame(directory, sim.config).sample(False, 1000),
+                max(1, repeat // 10)), **extra),
+        ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the simulation hot spots")
+    parser.add_argument('--pop-size', type=int, default=50)
+    parser.add_argument('--food-count', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--warmup-ticks', type=int, default=50)
+    parser.add_argument('--archive-size', type=int, default=5000,
+                        help="genomes in the hall-of-fame archive that is loaded")
+    parser.add_argument('--output', default='bench_micro.json')
+    args = parser.parse_args()
+
+    if args.food_count is not None:
+        apply_overrides({'FOOD_COUNT': args.food_count})
+    results = run(args.pop_size, args.seed, args.repeat, args.warmup_ticks, args.archive_size)
+    write_results(args.output, 'micro', results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Regression check of the batched code paths against the per-genome and
+per-agent reference implementations they replace:
+
+- CompatibilityDistance against neat's DefaultGenome.distance
+- VectorSpeciesSet against neat's DefaultSpeciesSet (species of every genome,
+  over several evolving generations)
+- sense against Agent.get_inputs
+- BatchNetwork.activate against neat.nn.FeedForwardNetwork.activate
+- SpeciatedPopulation.adopt: immigrants from another island process must
+  take new hidden nodes without clashing with the keys they arrived with
+
+    python -m benchmarks.reference_check --pop-size 150 --generations 5
+
+Speciation runs with a lower compatibility threshold than config.txt
+(--threshold), so that a young population splits into many species and
+the partitions have something to disagree on.
+
+Prints the largest difference of each check and exits with an error if any
+of them goes over the tolerance.
+"""
+import sys
+import random
+import argparse
+import numpy as np
+import neat
+from benchmarks.common import load_bench_config
+
+TOLERANCE = 1e-9
+
+def distance_check(config, genomes):
+    """Largest difference between CompatibilityDistance and genome.distance"""
+    from speciation import CompatibilityDistance
+
+    distance = CompatibilityDistance(config.genome_config)
+    tables = distance.table(genomes)
+    worst = 0.0
+    for ref in range(0, len(genomes), max(1, len(genomes) // 20)):
+        batched = distance.from_row(tables, ref)
+        reference = [genomes[ref].distance(g, config.genome_config) for g in genomes]
+        worst = max(worst, float(np.abs(batched - reference).max()))
+    return worst
+
+def speciation_check(config, generations):
+    """Genomes DefaultSpeciesSet places in another species, and species count, per generation
+
+    Both species sets speciate the same generations in turn, bred by a
+    SpeciatedPopulation with random fitness, so each also starts from the
+    representatives it kept from the generation before. Also returns the
+    last generation's genomes.
+    """
+    from speciation import SpeciatedPopulation, VectorSpeciesSet
+
+    population = SpeciatedPopulation(config, config.pop_size)
+    batched = VectorSpeciesSet(config.species_set_config, neat.reporting.ReporterSet())
+    reference = neat.DefaultSpeciesSet(config.species_set_config, neat.reporting.ReporterSet())
+    genomes = population.create()
+    mismatches = []
+    species = []
+    for generation in range(generations):
+        members = {genome.key: genome for genome in genomes}
+        batched.speciate(config, members, generation)
+        reference.speciate(config, members, generation)
+        mismatches.append(sum(batched.genome_to_species.get(key) != sid
+                              for key, sid in reference.genome_to_species.items()))
+        species.append(len(reference.species))
+        if generation < generations - 1:
+            genomes = population.reproduce(genomes, np.random.rand(len(genomes)) * 10)
+    return mismatches, species, genomes
+
+def sensing_check(sim):
+    """Largest difference between sense and Agent.get_inputs over the living agents"""
+    from sensing import sense
+
+    env = sim.environment
+    inputs = sense(sim.state, env.food_positions(), env.food_grid)
+    alive = [a for a in sim.agents if a.alive]
+    reference = np.array([a.get_inputs(env.foods, sim.agents) for a in alive])
+    return float(np.abs(inputs[[a.index for a in alive]] - reference).max(initial=0.0))
+
+def network_check(sim):
+    """Largest difference between BatchNetwork and FeedForwardNetwork on random inputs"""
+    inputs = np.random.uniform(-1.0, 1.0, (len(sim.agents), sim.networks.num_inputs))
+    batched = sim.networks.activate(inputs)
+    reference = np.array([a.net.activate(inputs[a.index].tolist()) for a in sim.agents])
+    return float(np.abs(batched[[a.index for a in sim.agents]] - reference).max())
+
+def migration_check(pop_size, nodes_added=5):
+    """Immigrants that break when the receiving population adds nodes to them
+
+    Two configs loaded separately stand in for two island processes, each
+    numbering new hidden nodes with its own indexer. The sender has grown
+    every genome, the receiver only one, so its indexer lags behind the
+    keys the immigrants arrive with. After adopt() the receiver adds nodes
+    to every immigrant, as mutation would in a later generation, and counts
+    the ones that fail neat's new node key check or end up with a
+    connection to a missing node.
+    """
+    from speciation import SpeciatedPopulation
+
+    sender_config = load_bench_config(pop_size)
+    sent = SpeciatedPopulation(sender_config, pop_size).create()
+    for genome in sent:
+        for _ in range(nodes_added):
+            genome.mutate_add_node(sender_config.genome_config)
+    config = load_bench_config(pop_size)
+    receiver = SpeciatedPopulation(config, pop_size)
+    receiver.create()[0].mutate_add_node(config.genome_config)
+
+    broken = 0
+    for genome in receiver.adopt(sent):
+        try:
+            for _ in range(nodes_added):
+                genome.mutate_add_node(config.genome_config)
+        except AssertionError:
+            broken += 1
+            continue
+        known = set(config.genome_config.input_keys) | set(genome.nodes)
+        broken += any(i not in known or o not in known for i, o in genome.connections)
+    return broken
+
+def run(pop_size, seed, generations, ticks, threshold):
+    from simulation import Simulation
+
+    random.seed(seed)
+    np.random.seed(seed)
+    config = load_bench_config(pop_size)
+    config.species_set_config.compatibility_threshold = threshold
+    mismatches, species, genomes = speciation_check(config, generations)
+    results = {
+        'CompatibilityDistance vs genome.distance': distance_check(config, genomes),
+        'VectorSpeciesSet vs DefaultSpeciesSet': sum(mismatches),
+    }
+    print(f"species per generation: {species}, mismatches: {mismatches}")
+
+    sim = Simulation(config, seed=seed)
+    # Evolved networks, and agents spread out from the spawn layout
+    for _ in range(generations - 1):
+        sim.state.fitness[:] = np.random.rand(sim.state.size) * 10
+        sim.next_generation()
+    for _ in range(ticks):
+        sim.tick()
+    results['sense vs Agent.get_inputs'] = sensing_check(sim)
+    results['BatchNetwork vs FeedForwardNetwork'] = network_check(sim)
+    results['immigrants with clashing node keys'] = migration_check(pop_size)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the batched code paths against neat "
+                                                 "and the per-agent reference implementations")
+    parser.add_argument('--pop-size', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--generations', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help="compatibility threshold used for the speciation check")
+    parser.add_argument('--ticks', type=int, default=50,
+                        help="ticks simulated before sensing and activation are compared")
+    args = parser.parse_args()
+
+    results = run(args.pop_size, args.seed, args.generations, args.ticks, args.threshold)
+    failed = [name for name, difference in results.items() if difference > TOLERANCE]
+    for name, difference in results.items():
+        status = 'FAIL' if name in failed else 'ok'
+        print(f"{name:42s} {difference:12.3g}   {status}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Headless simulation benchmark: ticks/sec, per-generation wall time and peak
+memory over a sweep of population, food, predator and world sizes.
+
+    python -m benchmarks.sim_bench --output bench_sim.json
+
+Every case runs in its own process so config overrides and peak memory
+don't leak between cases.
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+from benchmarks.common import ROOT, apply_overrides, load_bench_config, peak_memory_mb, write_results
+
+BASE_CASE = {'pop_size': 50, 'FOOD_COUNT': 20, 'PREDATOR_COUNT': 2,
+             'WINDOW_WIDTH': 800, 'WINDOW_HEIGHT': 600}
+
+# One parameter varied at a time around BASE_CASE
+SWEEP = {
+    'pop_size': [{'pop_size': n} for n in (50, 200, 1000)],
+    'FOOD_COUNT': [{'FOOD_COUNT': n} for n in (20, 100, 500)],
+    'PREDATOR_COUNT': [{'PREDATOR_COUNT': n} for n in (2, 10, 50)],
+    'world': [{'WINDOW_WIDTH': w, 'WINDOW_HEIGHT': h} for w, h in ((800, 600), (1600, 1200), (3200, 2400))],
+    # Population and world size together, to check sensing stays sub-quadratic
+    'scaling': [{'pop_size': n, 'WINDOW_WIDTH': w, 'WINDOW_HEIGHT': h}
+                for n in (200, 1000, 4000) for w, h in ((800, 600), (3200, 2400))],
+}
+
+def run_case(case, seed, generations, max_ticks):
+    """Run one case in this process and return its measurements"""
+    apply_overrides(case)
+    from simulation import Simulation
+    from profiling import PhaseProfiler
+
+    profiler = PhaseProfiler(enabled=True, window=max_ticks)
+    sim = Simulation(load_bench_config(case.get('pop_size')), seed=seed, profiler=profiler)
+    generation_times = []
+    start = time.perf_counter()
+    generation_start = start
+    while len(generation_times) < generations and sim.ticks < max_ticks:
+        if sim.step():
+            now = time.perf_counter()
+            generation_times.append(now - generation_start)
+            generation_start = now
+    elapsed = time.perf_counter() - start
+
+    return {
+        'case': case,
+        'seed': seed,
+        'ticks': sim.ticks,
+        'seconds': elapsed,
+        'ticks_per_sec': sim.ticks / elapsed if elapsed > 0 else None,
+        'generation_seconds': generation_times,
+        'sensing_ms': profiler.summary().get('sensing'),
+        'peak_memory_mb': peak_memory_mb(),
+    }
+
+def run_case_subprocess(case, seed, generations, max_ticks):
+    args = [sys.executable, '-m', 'benchmarks.sim_bench', '--case', json.dumps(case),
+            '--seed', str(seed), '--generations', str(generations), '--max-ticks', str(max_ticks)]
+    output = subprocess.run(args, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless simulation benchmark sweep")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--generations', type=int, default=2,
+                        help="generations to time per case")
+    parser.add_argument('--max-ticks', type=int, default=3000,
+                        help="stop a case after this many ticks even if generations remain")
+    parser.add_argument('--sweep', nargs='*', choices=sorted(SWEEP), default=sorted(SWEEP),
+                        help="which parameters to sweep")
+    parser.add_argument('--output', default='bench_sim.json')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        # Worker mode: run a single case and print its result as JSON
+        case = json.loads(args.case)
+        print(json.dumps(run_case(case, args.seed, args.generations, args.max_ticks)))
+        return
+
+    results = []
+    for name in args.sweep:
+        for variation in SWEEP[name]:
+            case = dict(BASE_CASE, **variation)
+            result = run_case_subprocess(case, args.seed, args.generations, args.max_ticks)
+            result['sweep'] = name
+            results.append(result)
+            print(f"{name:15s} {json.dumps(variation):45s} "
+                  f"{result['ticks_per_sec']:9.1f} ticks/s  "
+                  f"{result['sensing_ms'] or 0:8.2f} ms sensing  "
+                  f"{result['peak_memory_mb'] or 0:7.1f} MB")
+    write_results(args.output, 'simulation', results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Startup benchmark: wall time of a fresh interpreter importing the
+simulation core and running its first tick, and which heavy display or
+plotting modules each entry point pulls in.
+
+    python -m benchmarks.startup_bench --output bench_startup.json
+    python -m benchmarks.startup_bench --check   # fail if a core case imports them
+
+Every run is a new process, so nothing is cached between runs.
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+from benchmarks.common import ROOT, CONFIG_PATH, write_results
+from benchmarks.micro_bench import summarize
+
+HEAVY_MODULES = ('pygame', 'matplotlib')
+
+# Entry points that should start without HEAVY_MODULES
+CASES = {
+    'import simulation': "import simulation",
+    'import main': "import main",
+    'parallel worker init': "import parallel; parallel._init_worker(CONFIG_PATH)",
+    'headless first tick': ("from simulation import Simulation, load_config; "
+                            "Simulation(load_config(CONFIG_PATH), seed=0).tick()"),
+}
+
+def run_case(code):
+    """Run `code` in a fresh interpreter; returns its wall time and heavy modules loaded"""
+    script = (f"import sys, json; CONFIG_PATH = {CONFIG_PATH!r}\n{code}\n"
+              f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    elapsed = time.perf_counter() - start
+    return elapsed, json.loads(output.strip().splitlines()[-1])
+
+def run(repeat):
+    results = []
+    for name, code in CASES.items():
+        times = []
+        for _ in range(repeat):
+            elapsed, heavy = run_case(code)
+            times.append(elapsed)
+        results.append(summarize(name, times, heavy_modules=heavy))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of the simulation entry points")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--check', action='store_true',
+                        help="exit with an error if any case imports pygame or matplotlib")
+    parser.add_argument('--output', default='bench_startup.json')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    write_results(args.output, 'startup', results)
+    loaded = [r for r in results if r['heavy_modules']]
+    for r in loaded:
+        print(f"{r['name']} imports {', '.join(r['heavy_modules'])}")
+    if args.check and loaded:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
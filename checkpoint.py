@@ -0,0 +1,61 @@
+import os
+import zlib
+import pickle
+import threading
+from config import *
+
+MAGIC = b'NNEVOCK1'  # File signature and format version
+
+def write_atomic(path, data):
+    """Write bytes so that `path` always holds either the old or the new file"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def load_checkpoint(path):
+    """Snapshot dict saved by a Checkpointer"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a simulation checkpoint")
+    return pickle.loads(zlib.decompress(data[len(MAGIC):]))
+
+class Checkpointer:
+    """Periodic checkpoints of a Simulation, written off the main thread
+
+    The snapshot is pickled when save() is called, so it is consistent with
+    that moment; compressing and writing it happen on a background thread.
+    At most one write is in flight; a new save waits for the previous one.
+    """
+
+    def __init__(self, path, every=CHECKPOINT_EVERY):
+        self.path = path
+        self.every = every
+        self.thread = None
+        self.saved_generation = None
+
+    def maybe_save(self, sim):
+        """Save if `every` generations have passed since the last save"""
+        if self.every and sim.generation % self.every == 0 and sim.generation != self.saved_generation:
+            self.save(sim)
+
+    def save(self, sim, wait=False):
+        data = pickle.dumps(sim.snapshot(), protocol=pickle.HIGHEST_PROTOCOL)
+        self.wait()
+        self.saved_generation = sim.generation
+        self.thread = threading.Thread(target=self.write, args=(data,))
+        self.thread.start()
+        if wait:
+            self.wait()
+
+    def write(self, data):
+        write_atomic(self.path, MAGIC + zlib.compress(data, 1))
+
+    def wait(self):
+        """Block until the last checkpoint is on disk"""
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
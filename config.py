@@ -39,6 +39,32 @@ survival_threshold = 0.2
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
 FPS = 60
+GRID_CELL_SIZE = 50  # Cell size of the spatial index used for collisions and sensing
+GENERATION_TICK_BUDGET = 20000  # Ticks after which a generation ends (0 for no limit)
+STAGNATION_TICKS = 0  # End a generation when no agent gained fitness for this long (0 to disable)
+
+# Metrics parameters
+METRICS_HISTORY = 1000  # Generations of summary records kept in memory
+
+# Recording parameters
+RECORD_CAPACITY = 4096  # Ticks preallocated per recorded generation (doubled when exceeded)
+
+# Checkpoint parameters
+CHECKPOINT_EVERY = 10  # Generations between automatic checkpoints (0 to disable)
+
+# Island model parameters
+ISLAND_MIGRATION_INTERVAL = 5  # Generations between migrations
+ISLAND_MIGRANTS = 2  # Best prey sent to each neighbour (plus the best predator)
+ISLAND_TOPOLOGY = 'ring'  # 'ring' or 'full'
+
+# Hall of fame parameters
+HALL_OF_FAME_SIZE = 3  # Best genomes of each role archived per generation
+HALL_OF_FAME_PREY = 5  # Archived prey added to each generation as opponents
+HALL_OF_FAME_PREDATORS = 1  # Archived predators added to each generation as opponents
+HALL_OF_FAME_CACHE = 256  # Rebuilt archived genomes kept in memory
+
+# Network cache parameters
+NETWORK_CACHE_SIZE = 1000  # Compiled genome networks kept across generations
 
 # Agent parameters
 AGENT_RADIUS = 10
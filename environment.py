@@ -1,57 +1,108 @@
 import numpy as np
-import pygame
 from config import *
+from spatial import SpatialGrid, first_claims
 
 class Food:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
+    """View of one slot in the Environment's food pool"""
+
+    def __init__(self, environment, index):
+        self.environment = environment
+        self.index = index
         self.radius = FOOD_RADIUS
-        self.eaten = False
+
+    @property
+    def x(self):
+        return self.environment.food_xy[self.index, 0]
+
+    @property
+    def y(self):
+        return self.environment.food_xy[self.index, 1]
+
+    @property
+    def eaten(self):
+        return not self.environment.food_alive[self.index]
 
     def draw(self, screen):
+        import pygame
         if not self.eaten:
             pygame.draw.circle(screen, (255, 0, 0), (int(self.x), int(self.y)), self.radius)
 
 class Environment:
-    def __init__(self):
-        self.foods = []
+    """World food, kept in a fixed pool of FOOD_COUNT slots
+
+    Eaten slots go on a free list and are refilled in bulk from the
+    environment's own generator. With no seed, that generator is seeded from
+    NumPy's global one, so np.random.seed still makes a run reproducible.
+    """
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = np.random.randint(2**32, dtype=np.uint64)
+        self.rng = np.random.default_rng(seed)
+        self.food_xy = np.zeros((FOOD_COUNT, 2))
+        self.food_alive = np.zeros(FOOD_COUNT, dtype=bool)
+        self.free = list(range(FOOD_COUNT))  # Empty slots
+        self.food_grid = SpatialGrid()
         self.spawn_food()
 
     def spawn_food(self):
-        """Spawn new food particles"""
-        while len(self.foods) < FOOD_COUNT:
-            x = np.random.randint(FOOD_RADIUS, WINDOW_WIDTH - FOOD_RADIUS)
-            y = np.random.randint(FOOD_RADIUS, WINDOW_HEIGHT - FOOD_RADIUS)
-            self.foods.append(Food(x, y))
-
-    def update(self, agents):
-        """Update environment state and handle interactions"""
-        # Check for food consumption
-        for agent in agents:
-            if not agent.alive:
-                continue
-                
-            for food in self.foods:
-                if food.eaten:
-                    continue
-                    
-                # Check if agent is close enough to eat food
-                dist = np.sqrt((food.x - agent.x)**2 + (food.y - agent.y)**2)
-                if dist < agent.radius + food.radius:
-                    agent.eat(food)
-                    food.eaten = True
-
-        # Remove eaten food and spawn new food
-        self.foods = [food for food in self.foods if not food.eaten]
+        """Fill every free slot with new food"""
+        if self.free:
+            slots = np.array(self.free)
+            self.free.clear()
+            self.food_xy[slots, 0] = self.rng.integers(FOOD_RADIUS, WINDOW_WIDTH - FOOD_RADIUS,
+                                                       len(slots))
+            self.food_xy[slots, 1] = self.rng.integers(FOOD_RADIUS, WINDOW_HEIGHT - FOOD_RADIUS,
+                                                       len(slots))
+            self.food_alive[slots] = True
+        self.food_grid.build(self.food_xy, self.food_alive)
+
+    def update(self, state, rows=None):
+        """Update environment state and handle interactions for an AgentState
+
+        `rows` are the indices of the living agents, if already known.
+        Returns the number of food items eaten.
+        """
+        # Check for food consumption among nearby agent/food pairs
+        eaters = np.flatnonzero(state.alive) if rows is None else rows
+        reach = state.radius[eaters] + FOOD_RADIUS
+        agent, food, dist = self.food_grid.query_within(
+            state.x[eaters], state.y[eaters], reach.max(initial=0))
+        close = dist < reach[agent]
+
+        # Each food goes to the first agent that reaches it
+        eaters, eaten = first_claims(eaters[agent[close]], food[close])
+        self.food_alive[eaten] = False
+        self.free.extend(eaten.tolist())
+        fed, meals = np.unique(eaters, return_counts=True)
+        state.energy[fed] = np.minimum(state.max_energy[fed],
+                                       state.energy[fed] + meals * FOOD_ENERGY)
+        state.fitness[fed] += meals
+
+        # Refill the eaten slots
         self.spawn_food()
+        return len(eaten)
+
+    def food_positions(self):
+        """Coordinates of every pool slot (FOOD_COUNT x 2), as indexed by food_grid
+
+        The grid only holds uneaten food; `food_alive` marks which slots those are.
+        """
+        return self.food_xy
+
+    @property
+    def foods(self):
+        """Uneaten food as Food views, for the per-agent reference code"""
+        return [Food(self, i) for i in np.flatnonzero(self.food_alive)]
 
     def draw(self, screen):
         """Draw all food particles"""
-        for food in self.foods:
-            food.draw(screen)
+        import pygame
+        for x, y in self.food_xy[self.food_alive].astype(int).tolist():
+            pygame.draw.circle(screen, (255, 0, 0), (x, y), FOOD_RADIUS)
 
     def reset(self):
         """Reset environment state"""
-        self.foods = []
-        self.spawn_food() 
\ No newline at end of file
+        self.food_alive[:] = False
+        self.free = list(range(FOOD_COUNT))
+        self.spawn_food()
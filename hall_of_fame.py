@@ -0,0 +1,173 @@
+import os
+import json
+from collections import OrderedDict
+import numpy as np
+from config import *
+
+INDEX_DTYPE = np.dtype([
+    ('generation', np.int32),
+    ('predator', np.bool_),
+    ('fitness', np.float32),
+    ('key', np.int64),
+    ('node_start', np.int64),
+    ('node_count', np.int32),
+    ('connection_start', np.int64),
+    ('connection_count', np.int32),
+])
+NODE_DTYPE = np.dtype([
+    ('key', np.int32),
+    ('bias', np.float32),
+    ('response', np.float32),
+    ('activation', np.uint8),
+    ('aggregation', np.uint8),
+])
+CONNECTION_DTYPE = np.dtype([
+    ('input', np.int32),
+    ('output', np.int32),
+    ('weight', np.float32),
+    ('enabled', np.bool_),
+])
+
+class HallOfFame:
+    """Archive of the best prey and predator genomes of every generation
+
+    Genes are stored as packed records in append-only tables in `directory`
+    (index.bin, nodes.bin, connections.bin, plus names.json for activation
+    and aggregation names), with weights in float32. The index is read
+    into memory and the gene tables are memory-mapped, so opening an
+    archive of thousands of genomes reads only the index. Genomes are
+    rebuilt on demand and the last `cache_size` of them are kept, so a
+    recurring opponent also hits the NetworkCache of its compiled network.
+    """
+
+    def __init__(self, directory, config, per_generation=HALL_OF_FAME_SIZE,
+                 cache_size=HALL_OF_FAME_CACHE):
+        self.directory = directory
+        self.genome_config = config.genome_config
+        self.genome_type = config.genome_type
+        self.per_generation = per_generation
+        self.cache_size = cache_size
+        self.genomes = OrderedDict()
+        self.tables = {}
+        os.makedirs(directory, exist_ok=True)
+        self.index = self.read('index.bin', INDEX_DTYPE).copy()
+        names_path = os.path.join(directory, 'names.json')
+        if os.path.exists(names_path):
+            with open(names_path) as f:
+                self.names = json.load(f)
+        else:
+            self.names = {'activation': [], 'aggregation': []}
+
+    def __len__(self):
+        return len(self.index)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def count(self, name, dtype):
+        """Complete records in a table file"""
+        path = self.path(name)
+        return os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+
+    def read(self, name, dtype):
+        """Memory-mapped table, empty if nothing was written yet"""
+        count = self.count(name, dtype)
+        if not count:
+            return np.zeros(0, dtype)
+        return np.memmap(self.path(name), dtype=dtype, mode='r', shape=(count,))
+
+    def table(self, name, dtype, end):
+        """Gene table mapped far enough to hold record `end` - 1"""
+        table = self.tables.get(name)
+        if table is None or len(table) < end:
+            table = self.tables[name] = self.read(name, dtype)
+        return table
+
+    def code(self, kind, name):
+        names = self.names[kind]
+        if name not in names:
+            names.append(name)
+        return names.index(name)
+
+    def add(self, generation, predator, genomes, fitness):
+        """Archive the fittest `per_generation` of one role's genomes"""
+        order = sorted(range(len(genomes)), key=lambda i: -fitness[i])[:self.per_generation]
+        if not order:
+            return
+        node_start = self.count('nodes.bin', NODE_DTYPE)
+        connection_start = self.count('connections.bin', CONNECTION_DTYPE)
+
+        entries = np.zeros(len(order), INDEX_DTYPE)
+        nodes, connections = [], []
+        for row, i in enumerate(order):
+            genome = genomes[i]
+            node_rows = [(key, ng.bias, ng.response, self.code('activation', ng.activation),
+                          self.code('aggregation', ng.aggregation))
+                         for key, ng in sorted(genome.nodes.items())]
+            connection_rows = [(cg.key[0], cg.key[1], cg.weight, cg.enabled)
+                               for _, cg in sorted(genome.connections.items())]
+            entries[row] = (generation, predator, fitness[i], genome.key,
+                            node_start, len(node_rows), connection_start, len(connection_rows))
+            node_start += len(node_rows)
+            connection_start += len(connection_rows)
+            nodes += node_rows
+            connections += connection_rows
+
+        # Genes before the index, so an interrupted write leaves no dangling entries
+        with open(self.path('names.json'), 'w') as f:
+            json.dump(self.names, f)
+        with open(self.path('nodes.bin'), 'ab') as f:
+            f.write(np.array(nodes, NODE_DTYPE).tobytes())
+        with open(self.path('connections.bin'), 'ab') as f:
+            f.write(np.array(connections, CONNECTION_DTYPE).tobytes())
+        with open(self.path('index.bin'), 'ab') as f:
+            f.write(entries.tobytes())
+        self.index = np.concatenate((self.index, entries))
+
+    def genome(self, entry):
+        """Rebuilt genome of index entry `entry`"""
+        genome = self.genomes.get(entry)
+        if genome is not None:
+            self.genomes.move_to_end(entry)
+            return genome
+
+        e = self.index[entry]
+        node_end = int(e['node_start']) + int(e['node_count'])
+        connection_end = int(e['connection_start']) + int(e['connection_count'])
+        nodes = self.table('nodes.bin', NODE_DTYPE, node_end)[int(e['node_start']):node_end]
+        connections = self.table('connections.bin', CONNECTION_DTYPE,
+                                 connection_end)[int(e['connection_start']):connection_end]
+        activations = self.names['activation']
+        aggregations = self.names['aggregation']
+
+        genome = self.genome_type(int(e['key']))
+        genome.fitness = float(e['fitness'])
+        for key, bias, response, activation, aggregation in nodes.tolist():
+            ng = self.genome_config.node_gene_type(key)
+            ng.bias = bias
+            ng.response = response
+            ng.activation = activations[activation]
+            ng.aggregation = aggregations[aggregation]
+            genome.nodes[key] = ng
+        for i, o, weight, enabled in connections.tolist():
+            cg = self.genome_config.connection_gene_type((i, o))
+            cg.weight = weight
+            cg.enabled = enabled
+            genome.connections[(i, o)] = cg
+
+        self.genomes[entry] = genome
+        if len(self.genomes) > self.cache_size:
+            self.genomes.popitem(last=False)
+        return genome
+
+    def entries(self, predator):
+        """Index entries of archived prey or predators"""
+        return np.flatnonzero(self.index['predator'] == predator)
+
+    def sample(self, predator, count):
+        """Up to `count` distinct archived prey or predators, drawn with np.random"""
+        entries = self.entries(predator)
+        if not count or not len(entries):
+            return []
+        chosen = np.random.choice(entries, min(count, len(entries)), replace=False)
+        return [self.genome(int(entry)) for entry in chosen]
@@ -0,0 +1,105 @@
+"""
+Island-model evolution: each worker process runs its own Simulation, with
+its own environment and populations, and every few generations the islands
+send copies of their best genomes to their neighbours.
+
+    python main.py --headless --islands 8 --generations 100 --topology ring
+"""
+import queue
+import multiprocessing
+import numpy as np
+from simulation import Simulation, load_config
+from parallel import arena_seed
+from config import *
+
+TOPOLOGIES = ('ring', 'full')
+
+def neighbours(island, islands, topology):
+    """Islands that `island` sends its migrants to"""
+    if topology == 'ring':
+        return [(island + 1) % islands] if islands > 1 else []
+    if topology == 'full':
+        return [i for i in range(islands) if i != island]
+    raise ValueError(f"Unknown migration topology {topology!r}: use one of {', '.join(TOPOLOGIES)}")
+
+def best_genomes(sim, predators, count):
+    """(fitness, genome) of the `count` fittest prey or predators of the finished generation"""
+    ranked = sorted(((a.fitness, a.index, a.genome) for a in sim.population(predators)),
+                    key=lambda x: (-x[0], x[1]))
+    return [(fitness, genome) for fitness, _, genome in ranked[:count]]
+
+def choose_immigrants(messages, count):
+    """Best `count` genomes among the received migrants, independent of arrival order"""
+    pool = [(fitness, source, i, genome) for source, genomes in messages
+            for i, (fitness, genome) in enumerate(genomes)]
+    pool.sort(key=lambda x: (-x[0], x[1], x[2]))
+    return [genome for _, _, _, genome in pool[:count]]
+
+def run_island(island, config_path, seed, generations, topology, interval, migrants,
+               inboxes, results):
+    """Evolve one island, exchanging migrants through the inbox queues"""
+    sim = Simulation(load_config(config_path), seed=seed)
+    targets = neighbours(island, len(inboxes), topology)
+    sources = sum(island in neighbours(i, len(inboxes), topology) for i in range(len(inboxes)))
+    for _ in range(generations):
+        while not sim.generation_over():
+            sim.tick()
+        migrate = interval > 0 and (sim.generation + 1) % interval == 0 and sources
+        if not migrate:
+            sim.next_generation()
+        else:
+            outgoing = (best_genomes(sim, False, migrants), best_genomes(sim, True, 1))
+            for target in targets:
+                inboxes[target].put((island, outgoing))
+            received = [inboxes[island].get() for _ in range(sources)]
+            prey_in = choose_immigrants([(s, prey) for s, (prey, _) in received], migrants)
+            predators_in = choose_immigrants([(s, preds) for s, (_, preds) in received], 1)
+            sim.next_generation(immigrants=(prey_in, predators_in))
+
+        results.put(('generation', island, sim.generation, sim.best_fitness,
+                     sim.avg_fitness, sim.ticks))
+    results.put(('done', island, sim.generation, sim.best_fitness, sim.avg_fitness, sim.ticks))
+
+def run_islands(islands, generations, seed=None, topology=ISLAND_TOPOLOGY,
+                interval=ISLAND_MIGRATION_INTERVAL, migrants=ISLAND_MIGRANTS,
+                config_path='config.txt', on_generation=None):
+    """Run `islands` island processes for `generations` generations each
+
+    Island seeds are derived from `seed`, so a seeded run is reproducible.
+    Migration is synchronous: an island waits for its neighbours' migrants,
+    so results don't depend on process timing. Returns the final
+    (generation, best, avg, ticks) of every island.
+    """
+    neighbours(0, islands, topology)  # Validate the topology up front
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    inboxes = [multiprocessing.Queue() for _ in range(islands)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(
+        target=run_island,
+        args=(i, config_path, arena_seed(seed, i), generations, topology, interval, migrants,
+              inboxes, results),
+        daemon=True) for i in range(islands)]
+    for process in processes:
+        process.start()
+
+    final = {}
+    try:
+        while len(final) < islands:
+            try:
+                kind, island, *summary = results.get(timeout=1)
+            except queue.Empty:
+                failed = [i for i, p in enumerate(processes) if p.exitcode not in (None, 0)]
+                if failed:
+                    raise RuntimeError(f"Island {failed[0]} exited with code {processes[failed[0]].exitcode}")
+                continue
+            if kind == 'done':
+                final[island] = tuple(summary)
+            elif on_generation is not None:
+                on_generation(island, *summary)
+    finally:
+        for process in processes:
+            if process.is_alive() and len(final) < islands:
+                process.terminate()
+            process.join()
+    return [final[i] for i in range(islands)]
@@ -1,5 +1,10 @@
 import pygame
+import argparse
 import numpy as np
+from time import perf_counter
+from turmite import Turmites, palette
+from macro_ant import MacroAnt
+from renderer import TextCache
 
 # Initialize Pygame
 pygame.init()
@@ -9,11 +14,19 @@ WINDOW_SIZE = 800
 CELL_SIZE = 4
 GRID_SIZE = WINDOW_SIZE // CELL_SIZE
 FPS = 60
+STEPS_PER_FRAME = 100  # Ant steps simulated per rendered frame (Up/Down to change)
+MAX_STEPS_PER_FRAME = 10_000_000
+STEP_BUDGET = 0.75 / FPS  # Seconds of stepping per frame, the rest is left for drawing
 
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
+PALETTE = np.array([WHITE, BLACK], dtype=np.uint8)  # Cell state -> colour
+
+# Movement per direction: 0: up, 1: right, 2: down, 3: left
+DX = (0, 1, 0, -1)
+DY = (-1, 0, 1, 0)
 
 # Initialize the window
 screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
@@ -25,7 +38,7 @@ class Ant:
         self.x = GRID_SIZE // 2
         self.y = GRID_SIZE // 2
         self.direction = 0  # 0: up, 1: right, 2: down, 3: left
-        self.grid = np.zeros((GRID_SIZE, GRID_SIZE), dtype=int)
+        self.grid = np.zeros((GRID_SIZE, GRID_SIZE), dtype=np.uint8)
         self.steps = 0
 
     def move(self):
@@ -53,23 +66,116 @@ class Ant:
         
         self.steps += 1
 
+    def run(self, steps):
+        """Advance many steps at once, same rules as move()"""
+        # Tight loop over locals and a flat view of the grid
+        cells = memoryview(self.grid.reshape(-1))
+        x, y, direction = self.x, self.y, self.direction
+        for _ in range(steps):
+            i = y * GRID_SIZE + x
+            if cells[i] == 0:  # White cell: turn right
+                direction = (direction + 1) & 3
+                cells[i] = 1
+            else:  # Black cell: turn left
+                direction = (direction - 1) & 3
+                cells[i] = 0
+            x = (x + DX[direction]) % GRID_SIZE
+            y = (y + DY[direction]) % GRID_SIZE
+        self.x, self.y, self.direction = x, y, direction
+        self.steps += steps
+
     def draw(self):
-        # Draw the grid
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                color = BLACK if self.grid[y, x] == 1 else WHITE
-                pygame.draw.rect(screen, color, 
-                               (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        # Draw the grid as one scaled blit of the cell colours
+        # (surfarray is indexed [x][y], the grid [y][x])
+        pixels = PALETTE[self.grid.T]
+        surface = pygame.surfarray.make_surface(pixels)
+        screen.blit(pygame.transform.scale(surface, (WINDOW_SIZE, WINDOW_SIZE)), (0, 0))
         
         # Draw the ant
         ant_rect = pygame.Rect(self.x * CELL_SIZE, self.y * CELL_SIZE, 
                              CELL_SIZE, CELL_SIZE)
         pygame.draw.rect(screen, RED, ant_rect)
 
-def main():
-    ant = Ant()
+class Colony:
+    """Display wrapper around a single-world Turmites engine"""
+
+    def __init__(self, rule, ants, seed=None):
+        self.engine = Turmites(rule, ants, GRID_SIZE, seed)
+        self.palette = palette(self.engine.colours[0])
+
+    @property
+    def steps(self):
+        return self.engine.steps
+
+    def run(self, steps):
+        self.engine.run(steps)
+
+    def draw(self):
+        pixels = self.palette[self.engine.grid[0].T]
+        surface = pygame.surfarray.make_surface(pixels)
+        screen.blit(pygame.transform.scale(surface, (WINDOW_SIZE, WINDOW_SIZE)), (0, 0))
+
+        # Draw the ants
+        for x, y in zip(self.engine.x[0], self.engine.y[0]):
+            pygame.draw.rect(screen, RED, (x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+
+class MacroView:
+    """Display wrapper around a MacroAnt, following the ant across its unbounded grid"""
+
+    def __init__(self):
+        self.ant = MacroAnt()
+
+    @property
+    def steps(self):
+        return self.ant.steps
+
+    def run(self, steps):
+        self.ant.run(steps)
+
+    def draw(self):
+        x0 = self.ant.x - GRID_SIZE // 2
+        y0 = self.ant.y - GRID_SIZE // 2
+        pixels = PALETTE[self.ant.view(x0, y0, GRID_SIZE, GRID_SIZE).T]
+        surface = pygame.surfarray.make_surface(pixels)
+        screen.blit(pygame.transform.scale(surface, (WINDOW_SIZE, WINDOW_SIZE)), (0, 0))
+        pygame.draw.rect(screen, RED, ((GRID_SIZE // 2) * CELL_SIZE, (GRID_SIZE // 2) * CELL_SIZE,
+                                       CELL_SIZE, CELL_SIZE))
+
+def run_for_frame(ant, steps, budget=STEP_BUDGET):
+    """Run up to `steps` steps in chunks, stopping once `budget` seconds are spent
+
+    Chunks start small and grow to what the measured step rate fits in the
+    time left, so the window keeps handling events at any speed setting.
+    Returns the number of steps run.
+    """
+    start = perf_counter()
+    done = 0
+    chunk = min(steps, 64)
+    while done < steps:
+        ant.run(chunk)
+        done += chunk
+        elapsed = perf_counter() - start
+        if elapsed >= budget:
+            break
+        rate = done / max(elapsed, 1e-6)
+        chunk = max(1, min(steps - done, int(rate * (budget - elapsed))))
+    return done
+
+def main(rule=None, ants=1, seed=None, macro=False):
+    def create():
+        if macro:
+            return MacroView()
+        # The classic two-colour single ant keeps its fast scalar loop
+        if rule is None or (rule.upper() == 'RL' and ants == 1):
+            return Ant()
+        return Colony(rule, ants, seed)
+
+    ant = create()
     running = True
     paused = False
+    steps_per_frame = STEPS_PER_FRAME
+    steps_run = 0
+    text = TextCache(pygame.font.Font(None, 36))
     
     while running:
         for event in pygame.event.get():
@@ -79,21 +185,23 @@ def main():
                 if event.key == pygame.K_SPACE:
                     paused = not paused
                 elif event.key == pygame.K_r:
-                    ant = Ant()  # Reset
+                    ant = create()  # Reset
+                elif event.key == pygame.K_UP:
+                    steps_per_frame = min(steps_per_frame * 10, MAX_STEPS_PER_FRAME)
+                elif event.key == pygame.K_DOWN:
+                    steps_per_frame = max(steps_per_frame // 10, 1)
                 elif event.key == pygame.K_q:
                     running = False
 
         if not paused:
-            ant.move()
+            steps_run = run_for_frame(ant, steps_per_frame)
 
         # Draw everything
-        screen.fill(WHITE)
         ant.draw()
         
         # Draw step counter
-        font = pygame.font.Font(None, 36)
-        text = font.render(f"Steps: {ant.steps}", True, BLACK)
-        screen.blit(text, (10, 10))
+        screen.blit(text.render('steps', f"Steps: {ant.steps} ({steps_run}/{steps_per_frame} per frame)",
+                                BLACK), (10, 10))
         
         pygame.display.flip()
         clock.tick(FPS)
@@ -101,4 +209,11 @@ def main():
     pygame.quit()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Langton's ant and multi-colour turmites")
+    parser.add_argument('--rule', default=None, help='turn per colour, e.g. "RLR" or "LLRR"')
+    parser.add_argument('--ants', type=int, default=1, help="ants sharing the grid")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--macro', action='store_true',
+                        help="unbounded grid that jumps ahead once the ant builds a highway")
+    args = parser.parse_args()
+    main(args.rule, args.ants, args.seed, args.macro) 
\ No newline at end of file
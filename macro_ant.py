@@ -0,0 +1,284 @@
+"""
+Langton's ant on an unbounded sparse grid, with highway macro-stepping.
+
+After its chaotic phase the classic ant builds a "highway": a 104-step cycle
+that shifts it 2 cells diagonally into empty space. MacroAnt spots such a
+cycle from its recent moves and checks it exactly: the neighbourhood around
+the ant, hashed before and after one period, has to repeat, and no coloured
+cell may lie in the path ahead. It then jumps many periods at once. The
+skipped stretch of trail is stored as a compact Highway record rather than
+as cells, so billions of steps take a few kilobytes.
+
+    python macro_ant.py --steps 1000000000
+"""
+import argparse
+import numpy as np
+from collections import deque
+
+# Movement per direction: 0: up, 1: right, 2: down, 3: left
+DX = (0, 1, 0, -1)
+DY = (-1, 0, 1, 0)
+
+class Highway:
+    """Trail of `periods` skipped highway periods
+
+    Period k leaves behind the window's rear strip at origin + k * shift,
+    whose coloured cells are `strip` ({offset: colour}).
+    """
+
+    def __init__(self, origin, shift, strip, radius, periods):
+        self.origin = origin
+        self.shift = shift
+        self.strip = strip
+        self.radius = radius
+        self.periods = periods
+
+    def period_range(self, lo, hi):
+        """Periods whose window overlaps the box lo..hi (inclusive corners)"""
+        first, last = 0, self.periods - 1
+        for axis in range(2):
+            v = self.shift[axis]
+            a = lo[axis] - self.origin[axis] - self.radius
+            b = hi[axis] - self.origin[axis] + self.radius
+            if v == 0:
+                if a > 0 or b < 0:
+                    return 1, 0
+                continue
+            if v < 0:
+                a, b = -b, -a
+                v = -v
+            first = max(first, -(-a // v))
+            last = min(last, b // v)
+        return first, last
+
+    def colour(self, x, y):
+        first, last = self.period_range((x, y), (x, y))
+        for k in range(first, last + 1):
+            c = self.strip.get((x - self.origin[0] - k * self.shift[0],
+                                y - self.origin[1] - k * self.shift[1]))
+            if c:
+                return c
+        return 0
+
+    def stamp(self, view, x0, y0):
+        """Paint this trail into a dense view whose top-left cell is (x0, y0)"""
+        h, w = view.shape
+        first, last = self.period_range((x0, y0), (x0 + w - 1, y0 + h - 1))
+        if first > last:
+            return
+        k = np.arange(first, last + 1)
+        for (ox, oy), c in self.strip.items():
+            xs = self.origin[0] + ox + k * self.shift[0] - x0
+            ys = self.origin[1] + oy + k * self.shift[1] - y0
+            inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+            view[ys[inside], xs[inside]] = c
+
+class MacroAnt:
+    """Langton's ant on a sparse, unbounded grid that skips highway periods"""
+
+    def __init__(self, window_radius=12, max_period=1000, check_every=4096):
+        self.cells = {}  # (x, y) -> colour of every cell the ant has touched
+        self.highways = []
+        self.x = 0
+        self.y = 0
+        self.direction = 0
+        self.steps = 0
+        self.skipped_steps = 0
+        self.radius = window_radius
+        self.max_period = max_period
+        self.check_every = check_every
+        self.trace = deque(maxlen=3 * max_period + 1)  # Recent (x, y) after each step
+        self.trace.append((0, 0))
+
+    def colour(self, x, y):
+        c = self.cells.get((x, y))
+        if c is not None:
+            return c
+        for highway in self.highways:
+            c = highway.colour(x, y)
+            if c:
+                return c
+        return 0
+
+    def simulate(self, steps):
+        """Plain step-by-step simulation"""
+        cells = self.cells
+        trace = self.trace
+        x, y, direction = self.x, self.y, self.direction
+        for _ in range(steps):
+            c = cells.get((x, y))
+            if c is None:
+                c = self.colour(x, y) if self.highways else 0
+            if c == 0:  # White cell: turn right
+                direction = (direction + 1) & 3
+                cells[(x, y)] = 1
+            else:  # Black cell: turn left
+                direction = (direction - 1) & 3
+                cells[(x, y)] = 0
+            x += DX[direction]
+            y += DY[direction]
+            trace.append((x, y))
+        self.x, self.y, self.direction = x, y, direction
+        self.steps += steps
+
+    def run(self, steps):
+        """Advance `steps` steps, jumping across highways where possible"""
+        remaining = steps
+        while remaining > 0:
+            chunk = min(remaining, self.check_every)
+            self.simulate(chunk)
+            remaining -= chunk
+            if remaining > 0:
+                remaining -= self.try_jump(remaining)
+
+    def find_period(self):
+        """Shortest period over which the recent moves repeat, with its shift"""
+        trace = np.array(self.trace)
+        moves = np.diff(trace, axis=0)
+        for p in range(1, min(self.max_period, len(moves) // 3) + 1):
+            if (np.array_equal(moves[-p:], moves[-2*p:-p]) and
+                    np.array_equal(moves[-2*p:-p], moves[-3*p:-2*p])):
+                shift = tuple(int(v) for v in trace[-1] - trace[-1 - p])
+                if shift == (0, 0):
+                    return None
+                reach = np.abs(trace[-1 - p:] - trace[-1 - p]).max()
+                return p, shift, reach
+        return None
+
+    def window(self):
+        """Colours around the ant as a (2r+1) x (2r+1) array indexed [dy][dx]"""
+        r = self.radius
+        return self.view(self.x - r, self.y - r, 2 * r + 1, 2 * r + 1)
+
+    def state_key(self, window=None):
+        """Hashable key of the ant's heading and its neighbourhood"""
+        if window is None:
+            window = self.window()
+        return self.direction, window.tobytes()
+
+    def view(self, x0, y0, width, height):
+        """Dense array of cell colours for a rectangle of the grid"""
+        view = np.zeros((height, width), dtype=np.uint8)
+        for highway in self.highways:
+            highway.stamp(view, x0, y0)
+        for (x, y), c in self.cells.items():
+            if x0 <= x < x0 + width and y0 <= y < y0 + height:
+                view[y - y0, x - x0] = c
+        return view
+
+    def free_periods(self, shift):
+        """How many more periods the window can move by `shift` over empty space"""
+        r = self.radius
+        limit = np.inf
+        obstacles = [key for key, c in self.cells.items()
+                     if c and (abs(key[0] - self.x) > r or abs(key[1] - self.y) > r)]
+        boxes = [(c, c) for c in obstacles]
+        for highway in self.highways:
+            if not self.continues(highway, shift):
+                # Conservatively treat the whole trail's extent as occupied
+                far = (highway.origin[0] + (highway.periods - 1) * highway.shift[0],
+                       highway.origin[1] + (highway.periods - 1) * highway.shift[1])
+                boxes.append(((min(highway.origin[0], far[0]) - highway.radius,
+                               min(highway.origin[1], far[1]) - highway.radius),
+                              (max(highway.origin[0], far[0]) + highway.radius,
+                               max(highway.origin[1], far[1]) + highway.radius)))
+        for lo, hi in boxes:
+            first = 1
+            last = np.inf
+            for axis, pos in enumerate((self.x, self.y)):
+                v = shift[axis]
+                a = lo[axis] - pos - r
+                b = hi[axis] - pos + r
+                if v == 0:
+                    if a > 0 or b < 0:
+                        first, last = 1, 0
+                    continue
+                if v < 0:
+                    a, b, v = -b, -a, -v
+                first = max(first, -(-a // v))
+                last = min(last, b // v)
+            if first <= last:
+                limit = min(limit, first - 1)
+        return limit
+
+    def continues(self, highway, shift):
+        """True if the ant is further along the same highway line"""
+        if highway.shift != shift or highway.radius != self.radius:
+            return False
+        dx = self.x - highway.origin[0]
+        dy = self.y - highway.origin[1]
+        m = dx // shift[0] if shift[0] else dy // shift[1]
+        return (m >= highway.periods and dx == m * shift[0] and dy == m * shift[1])
+
+    def try_jump(self, budget):
+        """Verify a highway and skip whole periods of it; returns steps consumed"""
+        found = self.find_period()
+        if found is None:
+            return 0
+        period, shift, reach = found
+        r = self.radius
+        if reach + max(abs(shift[0]), abs(shift[1])) >= r or period > budget:
+            return 0
+
+        # Exact check: heading plus neighbourhood repeat after one period
+        before = self.window()
+        key = self.state_key(before)
+        start = (self.x, self.y)
+        self.simulate(period)
+        used = period
+        if (self.x - start[0], self.y - start[1]) != shift or self.state_key() != key:
+            return used
+
+        # Cells entering the window each period must arrive blank
+        offsets = np.arange(-r, r + 1)
+        ox = offsets[None, :]
+        oy = offsets[:, None]
+        front = (np.abs(ox + shift[0]) > r) | (np.abs(oy + shift[1]) > r)
+        if before[front].any():
+            return used
+
+        periods = min(self.free_periods(shift), (budget - used) // period)
+        if periods < 1:
+            return used
+        periods = int(periods)
+
+        # The rear strip left behind each period becomes the Highway record
+        rear = (np.abs(ox - shift[0]) > r) | (np.abs(oy - shift[1]) > r)
+        strip = {(int(offsets[j]), int(offsets[i])): int(before[i, j])
+                 for i, j in zip(*np.nonzero(rear & (before > 0)))}
+        for dy in offsets:
+            for dx in offsets:
+                self.cells.pop((self.x + dx, self.y + dy), None)
+        self.highways.append(Highway((self.x, self.y), shift, strip, r, periods))
+
+        # The ant arrives with the same neighbourhood, further along
+        self.x += periods * shift[0]
+        self.y += periods * shift[1]
+        for i, j in zip(*np.nonzero(before)):
+            self.cells[(self.x + int(offsets[j]), self.y + int(offsets[i]))] = int(before[i, j])
+        self.steps += periods * period
+        self.skipped_steps += periods * period
+        self.trace.clear()
+        self.trace.append((self.x, self.y))
+        return used + periods * period
+
+    def black_cells(self):
+        """Total number of black cells, including skipped highway trails"""
+        explicit = sum(1 for c in self.cells.values() if c)
+        trail = 0
+        for highway in self.highways:
+            trail += len(highway.strip) * highway.periods
+        return explicit + trail
+
+def main():
+    parser = argparse.ArgumentParser(description="Langton's ant with highway macro-stepping")
+    parser.add_argument('--steps', type=int, default=1_000_000_000)
+    args = parser.parse_args()
+
+    ant = MacroAnt()
+    ant.run(args.steps)
+    print(f"Steps: {ant.steps} (skipped {ant.skipped_steps} in {len(ant.highways)} jumps)")
+    print(f"Ant at ({ant.x}, {ant.y}), {ant.black_cells()} black cells")
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,119 @@
-import pygame
-import neat
-import os
-import random
-import numpy as np
-from agent import Agent
-from environment import Environment
-from visualization import Visualizer
+import time
+import argparse
+from simulation import Simulation, load_config
+from parallel import ParallelEvaluator
+from profiling import PhaseProfiler
+from scheduler import StepScheduler
+from metrics import GenerationMetrics, LogPlotter
+from checkpoint import Checkpointer, load_checkpoint
+from islands import run_islands, TOPOLOGIES
+from recorder import TrajectoryRecorder
+from hall_of_fame import HallOfFame
 from config import *
 
-def create_agents(config, pop_size):
-    """Create a population of agents"""
-    agents = []
-    # Create prey
-    for _ in range(pop_size):
-        x = random.randint(AGENT_RADIUS, WINDOW_WIDTH - AGENT_RADIUS)
-        y = random.randint(AGENT_RADIUS, WINDOW_HEIGHT - AGENT_RADIUS)
-        genome = neat.DefaultGenome(0)
-        genome.configure_new(config.genome_config)
-        agents.append(Agent(x, y, genome, config, is_predator=False))
-    
-    # Create predators
-    for _ in range(PREDATOR_COUNT):
-        x = random.randint(PREDATOR_RADIUS, WINDOW_WIDTH - PREDATOR_RADIUS)
-        y = random.randint(PREDATOR_RADIUS, WINDOW_HEIGHT - PREDATOR_RADIUS)
-        genome = neat.DefaultGenome(0)
-        genome.configure_new(config.genome_config)
-        agents.append(Agent(x, y, genome, config, is_predator=True))
-    
-    return agents
+def create_simulation(seed, profiler, metrics_log, checkpoint, resume, recorder=None,
+                      hall_of_fame=None):
+    """A new Simulation, or the one saved in `checkpoint` when resuming
+
+    `hall_of_fame` is the directory of an opponent archive to add to and
+    sample from, if any.
+    """
+    config = load_config()
+    metrics = GenerationMetrics(metrics_log, append=resume)
+    archive = HallOfFame(hall_of_fame, config) if hall_of_fame else None
+    if not resume:
+        return Simulation(config, seed=seed, profiler=profiler, metrics=metrics,
+                          recorder=recorder, hall_of_fame=archive)
+    # Starting from the saved genomes skips reset(), which would clear the metrics
+    snapshot = load_checkpoint(checkpoint)
+    sim = Simulation(config, profiler=profiler, metrics=metrics, recorder=recorder,
+                     hall_of_fame=archive,
+                     genomes=(snapshot['prey_genomes'], snapshot['predator_genomes']))
+    sim.restore(snapshot)
+    return sim
+
+def run_headless(generations, seed=None, workers=0, arenas=None, profiler=None,
+                 metrics_log=None, checkpoint=None, checkpoint_every=CHECKPOINT_EVERY,
+                 resume=False, recorder=None, hall_of_fame=None):
+    """Run the simulation without a display as fast as the CPU allows
+
+    With workers, each generation is split across arenas in a process pool
+    (and so isn't recorded).
+    """
+    sim = create_simulation(seed, profiler, metrics_log, checkpoint, resume, recorder,
+                            hall_of_fame)
+    checkpointer = Checkpointer(checkpoint, checkpoint_every) if checkpoint else None
+
+    def report(sim):
+        print(f"Generation {sim.generation}: best {sim.best_fitness:.1f}, "
+              f"avg {sim.avg_fitness:.1f}, ticks {sim.ticks}")
+        if checkpointer is not None:
+            checkpointer.maybe_save(sim)
+
+    evaluator = ParallelEvaluator('config.txt', workers, arenas) if workers else None
+    try:
+        sim.run(generations, on_generation=report, evaluator=evaluator)
+        if checkpointer is not None and checkpointer.saved_generation != sim.generation:
+            checkpointer.save(sim)
+    finally:
+        if evaluator is not None:
+            evaluator.close()
+        if checkpointer is not None:
+            checkpointer.wait()
+        if recorder is not None:
+            recorder.finish()
+    if metrics_log:
+        LogPlotter(metrics_log).render()
+    return sim
+
+def run_island_model(islands, generations, seed=None, topology=ISLAND_TOPOLOGY,
+                     interval=ISLAND_MIGRATION_INTERVAL, migrants=ISLAND_MIGRANTS):
+    """Run separate island populations in worker processes, exchanging migrants"""
+    def report(island, generation, best, avg, ticks):
+        print(f"Island {island} generation {generation}: best {best:.1f}, "
+              f"avg {avg:.1f}, ticks {ticks}")
+
+    final = run_islands(islands, generations, seed, topology, interval, migrants,
+                        on_generation=report)
+    best = max(final, key=lambda summary: summary[1])
+    print(f"Best fitness over {islands} islands: {best[1]:.1f}")
+    return final
+
+def main(seed=None, profiler=None, metrics_log='metrics.jsonl', checkpoint='checkpoint.bin',
+         checkpoint_every=CHECKPOINT_EVERY, resume=False, recorder=None, hall_of_fame=None):
+    # The display modules are only imported for the window, so headless runs
+    # and worker processes start without pygame
+    import pygame
+    from visualization import Visualizer
+    from renderer import Renderer
 
-def main():
     # Initialize pygame
     pygame.init()
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption("Neural Network Evolution")
     clock = pygame.time.Clock()
 
-    # Initialize NEAT
-    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
-                        neat.DefaultSpeciesSet, neat.DefaultStagnation,
-                        'config.txt')
-    
-    # Create initial population
-    agents = create_agents(config, config.pop_size)
-    environment = Environment()
-    visualizer = Visualizer(screen)
+    # Initialize NEAT and create initial population
+    profiler = profiler if profiler is not None else PhaseProfiler()
+    sim = create_simulation(seed, profiler, metrics_log, checkpoint, resume, recorder,
+                            hall_of_fame)
+    checkpointer = Checkpointer(checkpoint, checkpoint_every)
+    renderer = Renderer(screen)
+    visualizer = Visualizer(screen, renderer)
+    visualizer.generation = sim.generation
+    scheduler = StepScheduler()
+
+    # Keep the fitness plot current from the metrics log, off the main thread
+    plotter = LogPlotter(metrics_log)
+    plotter.start()
 
     # Main simulation loop
     running = True
     paused = False
+    show_profile = profiler.enabled
+    speed_keys = {pygame.K_1: 0, pygame.K_2: 1, pygame.K_3: 2, pygame.K_4: 3}
     
+    frame_dt = 1 / FPS
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -58,84 +122,136 @@ def main():
                 if event.key == pygame.K_SPACE:
                     paused = not paused
                 elif event.key == pygame.K_r:
-                    agents = create_agents(config, config.pop_size)
-                    environment.reset()
-                    visualizer = Visualizer(screen)
+                    sim.reset()
+                    visualizer = Visualizer(screen, renderer)
+                elif event.key == pygame.K_p:
+                    # Toggle profiling and its overlay together
+                    show_profile = not show_profile
+                    profiler.enabled = show_profile
+                elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    scheduler.faster()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    scheduler.slower()
+                elif event.key in speed_keys:
+                    scheduler.set_speed(speed_keys[event.key])
                 elif event.key == pygame.K_q:
                     running = False
 
         if not paused:
-            # Update environment and agents
-            environment.update(agents)
-            for agent in agents:
-                agent.update(environment.foods, agents)
-
-            # Handle predator-prey interactions
-            for predator in [a for a in agents if a.is_predator and a.alive]:
-                for prey in [a for a in agents if not a.is_predator and a.alive]:
-                    dist = np.sqrt((predator.x - prey.x)**2 + (predator.y - prey.y)**2)
-                    if dist < predator.radius + prey.radius:
-                        prey.alive = False
-                        predator.fitness += 5
-                        predator.energy += FOOD_ENERGY
-
-            # Check if all prey are dead
-            if all(not agent.alive for agent in agents if not agent.is_predator):
-                # Create next generation
-                visualizer.increment_generation()
-                
-                # Separate predators and prey
-                prey_genomes = [(a.genome, a.fitness) for a in agents if not a.is_predator]
-                pred_genomes = [(a.genome, a.fitness) for a in agents if a.is_predator]
-                
-                prey_genomes.sort(key=lambda x: x[1], reverse=True)
-                pred_genomes.sort(key=lambda x: x[1], reverse=True)
-                
-                # Create new population
-                new_agents = []
-                
-                # New prey
-                for i in range(config.pop_size):
-                    parent = random.choice(prey_genomes[:config.pop_size//2])[0]
-                    child = neat.DefaultGenome(i)
-                    child.configure_crossover(parent, parent, config.genome_config)
-                    child.mutate(config.genome_config)
-                    x = random.randint(AGENT_RADIUS, WINDOW_WIDTH - AGENT_RADIUS)
-                    y = random.randint(AGENT_RADIUS, WINDOW_HEIGHT - AGENT_RADIUS)
-                    new_agents.append(Agent(x, y, child, config, is_predator=False))
-                
-                # New predators
-                for i in range(PREDATOR_COUNT):
-                    parent = random.choice(pred_genomes[:PREDATOR_COUNT//2])[0]
-                    child = neat.DefaultGenome(i + config.pop_size)
-                    child.configure_crossover(parent, parent, config.genome_config)
-                    child.mutate(config.genome_config)
-                    x = random.randint(PREDATOR_RADIUS, WINDOW_WIDTH - PREDATOR_RADIUS)
-                    y = random.randint(PREDATOR_RADIUS, WINDOW_HEIGHT - PREDATOR_RADIUS)
-                    new_agents.append(Agent(x, y, child, config, is_predator=True))
-                
-                agents = new_agents
-                environment.reset()
+            # Run as many fixed-size ticks as this frame's share of the speed
+            steps = scheduler.steps_for_frame(frame_dt)
+            start = time.perf_counter()
+            for _ in range(steps):
+                if sim.step():
+                    visualizer.increment_generation()
+                    checkpointer.maybe_save(sim)
+            scheduler.record_ticks(steps, time.perf_counter() - start)
 
         # Draw everything
-        screen.fill((0, 0, 0))
-        environment.draw(screen)
-        for agent in agents:
-            agent.draw(screen)
+        render_start = time.perf_counter()
+        agents = sim.agents
+        with profiler.phase('drawing'):
+            renderer.begin()
+            renderer.draw_world(sim.state, sim.environment)
         
         # Draw statistics and neural network visualization
-        visualizer.draw_stats(agents)
-        if agents:
-            best_agent = max(agents, key=lambda x: x.fitness)
-            visualizer.draw_neural_network(best_agent, 
-                                        WINDOW_WIDTH - 200, 50, 150, 100)
+        with profiler.phase('stats'):
+            visualizer.draw_stats(sim.state, ~sim.archived)
+            if agents:
+                best_agent = visualizer.best_agent(agents, sim.state, ~sim.archived)
+                visualizer.draw_neural_network(best_agent, 
+                                            WINDOW_WIDTH - 200, 50, 180, 160)
+        if show_profile:
+            visualizer.draw_profile(profiler)
+        visualizer.draw_speed(scheduler.label(), scheduler.last_steps)
 
-        pygame.display.flip()
-        clock.tick(FPS)
+        renderer.present()
+        scheduler.record_render(time.perf_counter() - render_start)
+        frame_dt = clock.tick(FPS) / 1000
+
+    # Keep the population for a later --resume
+    checkpointer.save(sim, wait=True)
+    if recorder is not None:
+        recorder.finish()
 
     # Save fitness history plot
-    visualizer.plot_fitness_history()
+    plotter.stop()
+    visualizer.plot_fitness_history(metrics_log)
     pygame.quit()
 
+ISLAND_UNSUPPORTED = ('workers', 'arenas', 'metrics_log', 'record', 'record_every',
+                      'hall_of_fame', 'profile', 'profile_report', 'checkpoint',
+                      'checkpoint_every', 'resume')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Neural network evolution simulation")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without a display as fast as possible")
+    parser.add_argument('--generations', type=int, default=10,
+                        help="number of generations to run in headless mode")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="random seed for reproducible runs")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="headless only: evaluate each generation in this many worker processes")
+    parser.add_argument('--arenas', type=int, default=None,
+                        help="number of independent arenas per generation (default: one per worker)")
+    parser.add_argument('--islands', type=int, default=0,
+                        help="headless only: evolve this many separate populations in worker "
+                             "processes, exchanging their best genomes")
+    parser.add_argument('--topology', choices=TOPOLOGIES, default=ISLAND_TOPOLOGY,
+                        help="which islands exchange migrants")
+    parser.add_argument('--migration-interval', type=int, default=ISLAND_MIGRATION_INTERVAL,
+                        help="generations between migrations, 0 for fully isolated islands")
+    parser.add_argument('--migrants', type=int, default=ISLAND_MIGRANTS,
+                        help="best prey each island sends to each neighbour")
+    parser.add_argument('--metrics-log', default=None,
+                        help="append-only per-generation metrics log (default: metrics.jsonl "
+                             "with a display, none when headless)")
+    parser.add_argument('--record', default=None, metavar='DIR',
+                        help="record every tick to memory-mapped files in DIR (see replay.py)")
+    parser.add_argument('--record-every', type=int, default=1,
+                        help="record only every Nth generation")
+    parser.add_argument('--hall-of-fame', default=None, metavar='DIR',
+                        help="archive the best genomes of every generation in DIR and add "
+                             "past ones as opponents")
+    parser.add_argument('--profile', action='store_true',
+                        help="time each phase of the main loop (press P to toggle in the window)")
+    parser.add_argument('--profile-report', default=None,
+                        help="append per-generation phase timings to this .csv or JSON-lines file")
+    parser.add_argument('--checkpoint', default=None,
+                        help="checkpoint file (default: checkpoint.bin with a display, "
+                             "none when headless)")
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help="generations between checkpoints, 0 to only save on exit")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue the run saved in the checkpoint file")
+    args = parser.parse_args()
+    if args.islands:
+        if not args.headless:
+            parser.error("--islands requires --headless")
+        # Islands run their own simulations in worker processes without these
+        ignored = [name for name in ISLAND_UNSUPPORTED
+                   if getattr(args, name) != parser.get_default(name)]
+        if ignored:
+            parser.error(f"{', '.join('--' + name.replace('_', '-') for name in ignored)} "
+                         f"can't be combined with --islands")
+    return args
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    profiler = PhaseProfiler(enabled=args.profile, report_path=args.profile_report)
+    recorder = TrajectoryRecorder(args.record, args.record_every) if args.record else None
+    if args.headless and args.islands:
+        run_island_model(args.islands, args.generations, seed=args.seed, topology=args.topology,
+                         interval=args.migration_interval, migrants=args.migrants)
+    elif args.headless:
+        run_headless(args.generations, seed=args.seed, workers=args.workers,
+                     arenas=args.arenas, profiler=profiler, metrics_log=args.metrics_log,
+                     checkpoint=args.checkpoint, checkpoint_every=args.checkpoint_every,
+                     resume=args.resume, recorder=recorder, hall_of_fame=args.hall_of_fame)
+    else:
+        main(seed=args.seed, profiler=profiler,
+             metrics_log=args.metrics_log or 'metrics.jsonl',
+             checkpoint=args.checkpoint or 'checkpoint.bin',
+             checkpoint_every=args.checkpoint_every, resume=args.resume, recorder=recorder,
+             hall_of_fame=args.hall_of_fame)
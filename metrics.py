@@ -0,0 +1,199 @@
+import os
+import json
+import threading
+import numpy as np
+from config import *
+
+# Per-generation record layout
+FIELDS = [
+    ('generation', np.int64),
+    ('ticks', np.int64),
+    ('prey_best', np.float64),
+    ('prey_mean', np.float64),
+    ('prey_median', np.float64),
+    ('prey_p10', np.float64),
+    ('prey_p90', np.float64),
+    ('predator_best', np.float64),
+    ('predator_mean', np.float64),
+    ('prey_alive', np.int64),
+    ('predators_alive', np.int64),
+    ('prey_species', np.int64),
+    ('predator_species', np.int64),
+]
+
+# Fields renamed since older checkpoints were written
+RENAMED = {'species': 'prey_species'}
+
+class RingBuffer:
+    """Fixed-capacity buffer of structured records, oldest dropped first"""
+
+    def __init__(self, capacity, dtype):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.count = 0
+
+    def append(self, record):
+        self.data[self.count % self.capacity] = record
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def values(self):
+        """Records in insertion order"""
+        if self.count <= self.capacity:
+            return self.data[:self.count]
+        start = self.count % self.capacity
+        return np.concatenate((self.data[start:], self.data[:start]))
+
+class GenerationMetrics:
+    """Aggregates each finished generation into one record
+
+    Keeps the last METRICS_HISTORY records in a ring buffer and, with a
+    log_path, appends every record to a JSON-lines log on disk.
+    """
+
+    def __init__(self, log_path=None, capacity=METRICS_HISTORY, append=False):
+        self.dtype = np.dtype(FIELDS)
+        self.history = RingBuffer(capacity, self.dtype)
+        self.log_path = log_path
+        if log_path and not append:
+            self.clear()
+
+    def clear(self):
+        """Forget all records and start a fresh log"""
+        self.history = RingBuffer(self.history.capacity, self.dtype)
+        if self.log_path:
+            open(self.log_path, 'w').close()
+
+    def record(self, generation, state, ticks, species=(-1, -1), members=None):
+        """Summarize an AgentState at the end of a generation
+
+        `species` is the (prey, predator) species count. `members`
+        optionally masks the agents to summarize, leaving out hall-of-fame
+        opponents.
+        """
+        if members is None:
+            members = np.ones(state.size, dtype=bool)
+        prey_mask = members & ~state.is_predator
+        predator_mask = members & state.is_predator
+        prey = state.fitness[prey_mask]
+        predators = state.fitness[predator_mask]
+        record = {
+            'generation': generation,
+            'ticks': ticks,
+            'prey_best': prey.max(initial=0),
+            'prey_mean': prey.mean() if len(prey) else 0,
+            'prey_median': np.median(prey) if len(prey) else 0,
+            'prey_p10': np.percentile(prey, 10) if len(prey) else 0,
+            'prey_p90': np.percentile(prey, 90) if len(prey) else 0,
+            'predator_best': predators.max(initial=0),
+            'predator_mean': predators.mean() if len(predators) else 0,
+            'prey_alive': np.count_nonzero(state.alive & prey_mask),
+            'predators_alive': np.count_nonzero(state.alive & predator_mask),
+            'prey_species': species[0],
+            'predator_species': species[1],
+        }
+        self.history.append(tuple(record[name] for name, _ in FIELDS))
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps({k: v.item() if hasattr(v, 'item') else v
+                                    for k, v in record.items()}) + '\n')
+        return record
+
+    def snapshot(self):
+        """History and log length, for a checkpoint"""
+        size = os.path.getsize(self.log_path) if self.log_path and os.path.exists(self.log_path) else 0
+        return {'history': self.history, 'log_size': size}
+
+    def restore(self, snapshot):
+        """Return to a snapshot, dropping log records written after it"""
+        history = snapshot['history']
+        if history.data.dtype != self.dtype:
+            # Written with an older record layout: keep the fields it has
+            converted = RingBuffer(history.capacity, self.dtype)
+            converted.data['prey_species'] = converted.data['predator_species'] = -1
+            for name in history.data.dtype.names:
+                if RENAMED.get(name, name) in self.dtype.names:
+                    converted.data[RENAMED.get(name, name)] = history.data[name]
+            converted.count = history.count
+            history = converted
+        self.history = history
+        if self.log_path and os.path.exists(self.log_path):
+            with open(self.log_path, 'r+') as f:
+                f.truncate(min(snapshot['log_size'], os.path.getsize(self.log_path)))
+
+    def latest(self):
+        if not len(self.history):
+            return None
+        return self.history.values()[-1]
+
+class LogPlotter:
+    """Renders fitness plots from a metrics log, reading only new lines each time"""
+
+    def __init__(self, log_path, image_path='fitness_history.png'):
+        self.log_path = log_path
+        self.image_path = image_path
+        self.offset = 0
+        self.columns = {'generation': [], 'prey_best': [], 'prey_mean': [], 'predator_best': []}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def update(self):
+        """Read records appended to the log since the last update"""
+        if not os.path.exists(self.log_path):
+            return 0
+        if os.path.getsize(self.log_path) < self.offset:
+            # The log was restarted
+            self.offset = 0
+            for values in self.columns.values():
+                values.clear()
+        added = 0
+        with open(self.log_path) as f:
+            f.seek(self.offset)
+            while True:
+                line = f.readline()
+                if not line.endswith('\n'):
+                    break  # Partial line still being written
+                record = json.loads(line)
+                for name, values in self.columns.items():
+                    values.append(record[name])
+                self.offset = f.tell()
+                added += 1
+        return added
+
+    def render(self):
+        """Update from the log and write the plot image"""
+        # Figure/Agg directly rather than pyplot, so this is safe off the main thread
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        with self.lock:
+            self.update()
+            fig = Figure(figsize=(10, 6))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            ax.plot(self.columns['generation'], self.columns['prey_best'], label='Best Fitness')
+            ax.plot(self.columns['generation'], self.columns['prey_mean'], label='Average Fitness')
+            ax.plot(self.columns['generation'], self.columns['predator_best'], label='Best Predator Fitness')
+            ax.set_xlabel('Generation')
+            ax.set_ylabel('Fitness')
+            ax.set_title('Fitness Evolution')
+            ax.legend()
+            ax.grid(True)
+            fig.savefig(self.image_path)
+
+    def start(self, interval=30.0):
+        """Re-render the plot every `interval` seconds on a background thread"""
+        def loop():
+            while not self.stop_event.wait(interval):
+                self.render()
+
+        self.thread = threading.Thread(target=loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from batch_nn import compile_genome
+from config import *
+
+def genome_fingerprint(genome):
+    """Hashable key of everything that shapes a genome's network
+
+    Node genes and enabled connections with their exact values, but not the
+    genome key or fitness, so an unchanged genome in a later generation (an
+    elite, or a child no mutation touched) maps to the same network.
+    """
+    nodes = tuple(sorted((key, ng.bias, ng.response, ng.activation, ng.aggregation)
+                         for key, ng in genome.nodes.items()))
+    connections = tuple(sorted((cg.key, cg.weight)
+                               for cg in genome.connections.values() if cg.enabled))
+    return nodes, connections
+
+class NetworkCache:
+    """LRU cache of compiled genomes, keyed by genome_fingerprint
+
+    Holds at most `capacity` compiled networks; the least recently used one
+    is dropped when a new one would go over the limit.
+    """
+
+    def __init__(self, config, capacity=NETWORK_CACHE_SIZE):
+        self.genome_config = config.genome_config
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, genome):
+        """Compiled network of one genome, compiling it on a miss"""
+        return self.compile_all([genome])[0]
+
+    def compile_all(self, genomes):
+        """Compiled networks of a whole generation, in order
+
+        Identical genomes within the generation are compiled once. Entries
+        are only evicted after the whole generation is looked up, so a
+        generation larger than the cache still hits on everything it has.
+        """
+        entries = self.entries
+        compiled = []
+        for genome in genomes:
+            key = genome_fingerprint(genome)
+            network = entries.get(key)
+            if network is None:
+                self.misses += 1
+                network = entries[key] = compile_genome(genome, self.genome_config)
+            else:
+                self.hits += 1
+                entries.move_to_end(key)
+            compiled.append(network)
+        excess = len(entries) - self.capacity
+        for _ in range(max(excess, 0)):
+            entries.popitem(last=False)
+        self.evictions += max(excess, 0)
+        return compiled
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
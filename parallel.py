@@ -0,0 +1,93 @@
+import os
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from simulation import Simulation, load_config
+from network_cache import NetworkCache
+from config import *
+
+# NEAT config and compiled networks kept once per worker process
+_config = None
+_network_cache = None
+
+def _init_worker(config_path):
+    global _config, _network_cache
+    _config = load_config(config_path)
+    _network_cache = NetworkCache(_config)
+
+def arena_seed(seed, arena):
+    """Deterministic per-arena seed derived from a generation seed"""
+    return int(np.random.SeedSequence([seed, arena]).generate_state(1)[0])
+
+def split_arenas(num_prey, num_predators, arenas):
+    """Deterministically assign prey and predator indices to arenas
+
+    Prey are dealt round-robin. When there are fewer predators than arenas
+    every arena still gets one, so a predator may play in several arenas.
+    """
+    arenas = max(1, min(arenas, num_prey)) if num_prey else 1
+    assignment = []
+    for a in range(arenas):
+        prey = list(range(a, num_prey, arenas))
+        if num_predators >= arenas:
+            predators = list(range(a, num_predators, arenas))
+        elif num_predators:
+            predators = [a % num_predators]
+        else:
+            predators = []
+        assignment.append((prey, predators))
+    return assignment
+
+def evaluate_arena(prey_genomes, predator_genomes, seed):
+    """Play one generation in a private arena
+
+    Returns the prey fitness, predator fitness and number of ticks played.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    sim = Simulation(_config, genomes=(prey_genomes, predator_genomes),
+                     network_cache=_network_cache)
+    while not sim.generation_over():
+        sim.tick()
+    state = sim.state
+    return state.fitness[~state.is_predator], state.fitness[state.is_predator], sim.ticks
+
+class ParallelEvaluator:
+    """Evaluates a generation across independent arenas in worker processes"""
+
+    def __init__(self, config_path='config.txt', workers=None, arenas=None):
+        self.workers = workers or os.cpu_count()
+        self.arenas = arenas or self.workers
+        self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                        initializer=_init_worker,
+                                        initargs=(config_path,))
+
+    def evaluate(self, prey_genomes, predator_genomes, seed):
+        """Fitness of every prey and predator genome, plus total ticks played
+
+        A predator that plays in several arenas gets its mean fitness.
+        """
+        assignment = split_arenas(len(prey_genomes), len(predator_genomes), self.arenas)
+        futures = []
+        for a, (prey, predators) in enumerate(assignment):
+            futures.append(self.pool.submit(
+                evaluate_arena,
+                [prey_genomes[i] for i in prey],
+                [predator_genomes[i] for i in predators],
+                arena_seed(seed, a)))
+
+        prey_fitness = np.zeros(len(prey_genomes))
+        predator_fitness = np.zeros(len(predator_genomes))
+        predator_games = np.zeros(len(predator_genomes))
+        ticks = 0
+        for (prey, predators), future in zip(assignment, futures):
+            prey_result, predator_result, arena_ticks = future.result()
+            prey_fitness[prey] = prey_result
+            np.add.at(predator_fitness, predators, predator_result)
+            np.add.at(predator_games, predators, 1)
+            ticks += arena_ticks
+        predator_fitness /= np.maximum(predator_games, 1)
+        return prey_fitness, predator_fitness, ticks
+
+    def close(self):
+        self.pool.shutdown()
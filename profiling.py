@@ -0,0 +1,113 @@
+import os
+import csv
+import json
+import numpy as np
+from time import perf_counter
+
+class _NullPhase:
+    """Shared do-nothing context used while profiling is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, perf_counter() - self.start)
+        return False
+
+class PhaseProfiler:
+    """Switchable wall-clock timing of the phases of the main loop
+
+    Wrap a phase in `with profiler.phase('sensing'):`. While disabled that
+    costs one attribute check. Each phase keeps a rolling window of recent
+    samples for histograms and the overlay, plus the samples of the current
+    generation, which end_generation() turns into one report row per phase.
+    """
+
+    REPORT_FIELDS = ['generation', 'phase', 'calls', 'total_ms', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms']
+
+    def __init__(self, enabled=False, window=600, report_path=None):
+        self.enabled = enabled
+        self.window = window
+        self.report_path = report_path
+        self.samples = {}
+        self.counts = {}
+        self.generation_samples = {}
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def record(self, name, seconds):
+        """Add one timing sample in seconds"""
+        if name not in self.samples:
+            self.samples[name] = np.zeros(self.window)
+            self.counts[name] = 0
+            self.generation_samples[name] = []
+        self.samples[name][self.counts[name] % self.window] = seconds
+        self.counts[name] += 1
+        self.generation_samples[name].append(seconds)
+
+    def recent(self, name):
+        """Samples in the rolling window for a phase"""
+        return self.samples[name][:min(self.counts[name], self.window)]
+
+    def histogram(self, name, bins=20):
+        """Rolling histogram (counts, edges in ms) of a phase's recent samples"""
+        return np.histogram(self.recent(name) * 1000, bins=bins)
+
+    def summary(self):
+        """Mean time in ms per phase over the rolling window"""
+        return {name: float(self.recent(name).mean()) * 1000 for name in self.samples}
+
+    def end_generation(self, generation):
+        """Close the current generation's stats and append them to the report"""
+        rows = []
+        for name, samples in self.generation_samples.items():
+            if not samples:
+                continue
+            ms = np.array(samples) * 1000
+            rows.append({
+                'generation': generation,
+                'phase': name,
+                'calls': len(ms),
+                'total_ms': float(ms.sum()),
+                'mean_ms': float(ms.mean()),
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p95_ms': float(np.percentile(ms, 95)),
+                'max_ms': float(ms.max()),
+            })
+            samples.clear()
+        if self.report_path and rows:
+            self.write_report(rows)
+        return rows
+
+    def write_report(self, rows):
+        """Append rows to the report, CSV for a .csv path and JSON lines otherwise"""
+        if self.report_path.endswith('.csv'):
+            new_file = not os.path.exists(self.report_path)
+            with open(self.report_path, 'a', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.REPORT_FIELDS)
+                if new_file:
+                    writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(self.report_path, 'a') as f:
+                for row in rows:
+                    f.write(json.dumps(row) + '\n')
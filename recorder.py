@@ -0,0 +1,105 @@
+import os
+import json
+import numpy as np
+from config import *
+
+def tick_dtype(agents, foods):
+    """One recorded tick: every agent's pose, energy and alive flag, plus the food pool"""
+    return np.dtype([
+        ('x', np.float32, (agents,)),
+        ('y', np.float32, (agents,)),
+        ('angle', np.float32, (agents,)),
+        ('energy', np.float32, (agents,)),
+        ('alive', np.bool_, (agents,)),
+        ('food_xy', np.float32, (foods, 2)),
+        ('food_alive', np.bool_, (foods,)),
+    ])
+
+def chunk_paths(directory, generation):
+    """Data and metadata file of one generation's chunk"""
+    stem = os.path.join(directory, f"generation_{generation:06d}")
+    return stem + '.npy', stem + '.json'
+
+def recorded_generations(directory):
+    """Generations with a finished chunk in `directory`, in order"""
+    return sorted(int(name[len('generation_'):-len('.json')]) for name in os.listdir(directory)
+                  if name.startswith('generation_') and name.endswith('.json'))
+
+def load_chunk(directory, generation):
+    """Memory-mapped ticks and metadata of one generation, without reading the data"""
+    data_path, meta_path = chunk_paths(directory, generation)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    ticks = np.load(data_path, mmap_mode='r')
+    return ticks[:meta['ticks']], meta
+
+class TrajectoryRecorder:
+    """Writes every tick of selected generations to memory-mapped .npy chunks
+
+    Each generation gets a preallocated file of `capacity` ticks, doubled if
+    the generation runs longer, and a small JSON file with the number of
+    ticks recorded and the kind of each agent. Every `every`-th generation
+    is recorded.
+    """
+
+    def __init__(self, directory, every=1, capacity=RECORD_CAPACITY):
+        self.directory = directory
+        self.every = every
+        self.capacity = capacity
+        self.generation = None
+        self.ticks = None
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, sim):
+        """Append the current tick of a Simulation"""
+        if sim.generation % self.every:
+            return
+        if self.generation != sim.generation:
+            self.begin(sim)
+        if self.count == len(self.ticks):
+            self.grow()
+        state = sim.state
+        env = sim.environment
+        tick = self.ticks[self.count]
+        tick['x'] = state.x
+        tick['y'] = state.y
+        tick['angle'] = state.angle
+        tick['energy'] = state.energy
+        tick['alive'] = state.alive
+        tick['food_xy'] = env.food_xy
+        tick['food_alive'] = env.food_alive
+        self.count += 1
+
+    def begin(self, sim):
+        self.finish()
+        self.generation = sim.generation
+        self.count = 0
+        self.is_predator = sim.state.is_predator.tolist()
+        data_path, _ = chunk_paths(self.directory, self.generation)
+        dtype = tick_dtype(sim.state.size, len(sim.environment.food_alive))
+        self.ticks = np.lib.format.open_memmap(data_path, mode='w+', dtype=dtype,
+                                               shape=(self.capacity,))
+
+    def grow(self):
+        """Move the chunk into a file twice as long"""
+        data_path, _ = chunk_paths(self.directory, self.generation)
+        old = self.ticks
+        tmp = data_path + '.tmp'
+        self.ticks = np.lib.format.open_memmap(tmp, mode='w+', dtype=old.dtype,
+                                               shape=(2 * len(old),))
+        self.ticks[:len(old)] = old
+        del old
+        os.replace(tmp, data_path)
+
+    def finish(self):
+        """Flush the current chunk and write its metadata"""
+        if self.ticks is None:
+            return
+        self.ticks.flush()
+        _, meta_path = chunk_paths(self.directory, self.generation)
+        with open(meta_path, 'w') as f:
+            json.dump({'generation': self.generation, 'ticks': self.count,
+                       'is_predator': self.is_predator}, f)
+        self.ticks = None
+        self.generation = None
@@ -0,0 +1,116 @@
+import numpy as np
+import pygame
+from config import *
+
+HEADINGS = 64  # Pre-rendered agent orientations
+COLORKEY = (255, 0, 255)  # Transparent colour of the sprites
+BACKGROUND = (0, 0, 0)
+MAX_DIRTY_AREA = 0.5  # Fraction of the window above which a full flip is cheaper
+
+def make_sprite(size):
+    """Blank colorkeyed sprite surface"""
+    surface = pygame.Surface((size, size))
+    surface.fill(COLORKEY)
+    surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return surface
+
+def agent_sprites(radius, color, vision):
+    """One sprite per heading with the body, direction line and (for prey) vision cone"""
+    reach = VISION_RANGE if vision else radius
+    center = reach + 2
+    sprites = []
+    for h in range(HEADINGS):
+        angle = 2 * np.pi * h / HEADINGS
+        sprite = make_sprite(2 * center + 1)
+        pygame.draw.circle(sprite, color, (center, center), radius)
+        pygame.draw.line(sprite, (255, 255, 255), (center, center),
+                         (center + np.cos(angle) * radius, center + np.sin(angle) * radius), 2)
+        if vision:
+            left = angle - np.radians(VISION_ANGLE / 2)
+            right = angle + np.radians(VISION_ANGLE / 2)
+            points = [(center, center),
+                      (center + np.cos(left) * VISION_RANGE, center + np.sin(left) * VISION_RANGE),
+                      (center + np.cos(right) * VISION_RANGE, center + np.sin(right) * VISION_RANGE)]
+            pygame.draw.polygon(sprite, (100, 100, 100), points, 1)
+        sprites.append(sprite)
+    return sprites, center
+
+class TextCache:
+    """Rendered text surfaces, re-rendered only when a slot's text changes"""
+
+    def __init__(self, font):
+        self.font = font
+        self.slots = {}
+
+    def render(self, slot, text, color=(255, 255, 255)):
+        entry = self.slots.get(slot)
+        if entry is None or entry[0] != (text, color):
+            entry = ((text, color), self.font.render(text, True, color))
+            self.slots[slot] = entry
+        return entry[1]
+
+class Renderer:
+    """Draws the world from the AgentState and food pool with batched sprite blits
+
+    Everything drawn in a frame is recorded as dirty rects. present()
+    updates only the rects of this frame and the last one, unless they
+    cover most of the window, in which case it flips the whole display.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.prey, self.prey_center = agent_sprites(AGENT_RADIUS, (0, 255, 0), vision=True)
+        self.predators, self.predator_center = agent_sprites(PREDATOR_RADIUS, (255, 0, 0),
+                                                             vision=False)
+        self.food = make_sprite(2 * FOOD_RADIUS + 1)
+        pygame.draw.circle(self.food, (255, 0, 0), (FOOD_RADIUS, FOOD_RADIUS), FOOD_RADIUS)
+        self.dirty = []
+        self.previous = None  # None forces a full flip
+
+    def begin(self):
+        """Start a frame on a cleared screen"""
+        self.screen.fill(BACKGROUND)
+        self.dirty = []
+
+    def mark(self, rect):
+        """Include a rect drawn outside the renderer in this frame's update"""
+        self.dirty.append(rect)
+
+    def blit(self, surface, pos):
+        self.dirty.append(self.screen.blit(surface, pos))
+
+    def draw_world(self, state, environment):
+        """Blit all food and living agents in one batch"""
+        self.draw(state.x, state.y, state.angle, state.alive, state.is_predator,
+                  environment.food_xy, environment.food_alive)
+
+    def draw(self, x, y, angle, alive, is_predator, food_xy, food_alive):
+        """Blit food and agents given as arrays, e.g. from a recording"""
+        food = np.asarray(food_xy)[food_alive].astype(int) - FOOD_RADIUS
+        blits = [(self.food, pos) for pos in map(tuple, food.tolist())]
+
+        alive = np.flatnonzero(alive)
+        heading = np.rint(angle[alive] / (2 * np.pi) * HEADINGS).astype(int) % HEADINGS
+        predator = is_predator[alive]
+        center = np.where(predator, self.predator_center, self.prey_center)
+        x = x[alive].astype(int) - center
+        y = y[alive].astype(int) - center
+        for is_predator, h, px, py in zip(predator.tolist(), heading.tolist(), x.tolist(), y.tolist()):
+            sprites = self.predators if is_predator else self.prey
+            blits.append((sprites[h], (px, py)))
+        self.dirty.extend(self.screen.blits(blits))
+
+    def present(self):
+        """Show the frame, updating only what changed when that is cheaper"""
+        rects = self.dirty if self.previous is None else self.previous + self.dirty
+        area = sum(r.width * r.height for r in rects)
+        screen_area = self.screen.get_width() * self.screen.get_height()
+        if self.previous is None or area > MAX_DIRTY_AREA * screen_area:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        self.previous = self.dirty
+
+    def invalidate(self):
+        """Make the next present() redraw the whole window"""
+        self.previous = None
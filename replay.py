@@ -0,0 +1,140 @@
+"""
+Replay viewer for runs recorded with `python main.py --headless --record DIR`.
+
+Ticks are read straight from the memory-mapped chunks, so opening a long
+generation or jumping to any tick is immediate.
+
+    python replay.py DIR [--generation N]
+
+Controls: SPACE play/pause, Left/Right step one tick (Shift: 100),
+Up/Down playback speed, PageUp/PageDown previous/next generation,
+Home/End first/last tick, click or drag the bar at the bottom to scrub,
+Q quit.
+"""
+import argparse
+import numpy as np
+import pygame
+from config import *
+from recorder import load_chunk, recorded_generations
+from renderer import Renderer, TextCache
+
+BAR_HEIGHT = 16
+SPEEDS = [1, 2, 5, 10, 25, 50]  # Ticks advanced per frame while playing
+
+class Replay:
+    """Playback position within the recorded generations of a directory"""
+
+    def __init__(self, directory, generation=None):
+        self.directory = directory
+        self.generations = recorded_generations(directory)
+        if not self.generations:
+            raise SystemExit(f"No recorded generations in {directory}")
+        start = self.generations.index(generation) if generation in self.generations else 0
+        self.open(start)
+
+    def open(self, index):
+        self.index = index
+        self.ticks, meta = load_chunk(self.directory, self.generations[index])
+        self.is_predator = np.array(meta['is_predator'], dtype=bool)
+        self.tick = 0
+
+    @property
+    def generation(self):
+        return self.generations[self.index]
+
+    def seek(self, tick):
+        self.tick = int(np.clip(tick, 0, max(len(self.ticks) - 1, 0)))
+
+    def switch(self, offset):
+        """Open the previous or next recorded generation"""
+        index = self.index + offset
+        if 0 <= index < len(self.generations):
+            self.open(index)
+
+    def draw(self, renderer):
+        if not len(self.ticks):
+            return
+        tick = self.ticks[self.tick]
+        renderer.draw(tick['x'], tick['y'], tick['angle'], tick['alive'], self.is_predator,
+                      tick['food_xy'], tick['food_alive'])
+
+    def draw_bar(self, screen):
+        """Scrub bar along the bottom of the window"""
+        top = WINDOW_HEIGHT - BAR_HEIGHT
+        bar = pygame.draw.rect(screen, (60, 60, 60), (0, top, WINDOW_WIDTH, BAR_HEIGHT))
+        if len(self.ticks) > 1:
+            x = int(self.tick / (len(self.ticks) - 1) * (WINDOW_WIDTH - 1))
+            pygame.draw.rect(screen, (200, 200, 200), (0, top, x, BAR_HEIGHT))
+        return bar
+
+    def tick_at(self, x):
+        """Tick under horizontal position `x` of the scrub bar"""
+        return round(x / (WINDOW_WIDTH - 1) * (len(self.ticks) - 1))
+
+def main(directory, generation=None):
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Replay")
+    clock = pygame.time.Clock()
+    renderer = Renderer(screen)
+    text = TextCache(pygame.font.Font(None, 24))
+
+    replay = Replay(directory, generation)
+    playing = True
+    speed = 0
+    scrubbing = False
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                step = 100 if event.mod & pygame.KMOD_SHIFT else 1
+                if event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_RIGHT:
+                    replay.seek(replay.tick + step)
+                elif event.key == pygame.K_LEFT:
+                    replay.seek(replay.tick - step)
+                elif event.key == pygame.K_UP:
+                    speed = min(speed + 1, len(SPEEDS) - 1)
+                elif event.key == pygame.K_DOWN:
+                    speed = max(speed - 1, 0)
+                elif event.key == pygame.K_PAGEUP:
+                    replay.switch(-1)
+                elif event.key == pygame.K_PAGEDOWN:
+                    replay.switch(1)
+                elif event.key == pygame.K_HOME:
+                    replay.seek(0)
+                elif event.key == pygame.K_END:
+                    replay.seek(len(replay.ticks) - 1)
+                elif event.key == pygame.K_q:
+                    running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.pos[1] >= WINDOW_HEIGHT - BAR_HEIGHT:
+                scrubbing = True
+                replay.seek(replay.tick_at(event.pos[0]))
+            elif event.type == pygame.MOUSEMOTION and scrubbing:
+                replay.seek(replay.tick_at(event.pos[0]))
+            elif event.type == pygame.MOUSEBUTTONUP:
+                scrubbing = False
+
+        if playing and not scrubbing:
+            replay.seek(replay.tick + SPEEDS[speed])
+
+        renderer.begin()
+        replay.draw(renderer)
+        renderer.mark(replay.draw_bar(screen))
+        status = (f"Generation {replay.generation}  tick {replay.tick + 1}/{len(replay.ticks)}  "
+                  f"x{SPEEDS[speed]}{'' if playing else '  (paused)'}")
+        renderer.blit(text.render('status', status), (10, 10))
+        renderer.present()
+        clock.tick(FPS)
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded generations")
+    parser.add_argument('directory')
+    parser.add_argument('--generation', type=int, default=None)
+    args = parser.parse_args()
+    main(args.directory, args.generation)
@@ -0,0 +1,71 @@
+from config import *
+
+class StepScheduler:
+    """Decides how many simulation ticks to run per rendered frame
+
+    At a speed multiplier of m the world advances m * tick_rate ticks per
+    second of wall time using a fixed-timestep accumulator. K is capped at
+    what fits in one frame at target_fps, going by running averages of tick
+    and render time, so the display stays live. The uncapped speed always
+    runs that affordable K.
+    """
+
+    SPEEDS = [1, 10, 100, None]  # None: uncapped
+    MAX_FRAME_TIME = 0.25  # Ignore longer frame gaps (window drags, breakpoints)
+
+    def __init__(self, tick_rate=FPS, target_fps=FPS, smoothing=0.1):
+        self.tick_rate = tick_rate
+        self.target_fps = target_fps
+        self.smoothing = smoothing
+        self.speed_index = 0
+        self.accumulator = 0.0
+        self.tick_time = 0.001
+        self.render_time = 0.0
+        self.last_steps = 0
+
+    @property
+    def speed(self):
+        return self.SPEEDS[self.speed_index]
+
+    def label(self):
+        return "uncapped" if self.speed is None else f"{self.speed}x"
+
+    def set_speed(self, index):
+        self.speed_index = max(0, min(len(self.SPEEDS) - 1, index))
+        self.accumulator = 0.0
+
+    def faster(self):
+        self.set_speed(self.speed_index + 1)
+
+    def slower(self):
+        self.set_speed(self.speed_index - 1)
+
+    def affordable_steps(self):
+        """Ticks that fit in one frame's budget after rendering"""
+        budget = 1.0 / self.target_fps - self.render_time
+        return max(1, int(budget / self.tick_time))
+
+    def steps_for_frame(self, frame_dt):
+        """Number of ticks to run for a frame that took frame_dt seconds"""
+        affordable = self.affordable_steps()
+        if self.speed is None:
+            steps = affordable
+        else:
+            self.accumulator += min(frame_dt, self.MAX_FRAME_TIME) * self.tick_rate * self.speed
+            steps = int(self.accumulator)
+            self.accumulator -= steps
+            if steps > affordable:
+                # Falling behind: drop the backlog rather than stall the display
+                steps = affordable
+                self.accumulator = 0.0
+        self.last_steps = steps
+        return steps
+
+    def record_ticks(self, steps, seconds):
+        """Update the running average of time per tick"""
+        if steps > 0:
+            self.tick_time += self.smoothing * (seconds / steps - self.tick_time)
+
+    def record_render(self, seconds):
+        """Update the running average of time per rendered frame"""
+        self.render_time += self.smoothing * (seconds - self.render_time)
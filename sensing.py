@@ -0,0 +1,148 @@
+import numpy as np
+from config import *
+from spatial import SpatialGrid
+
+# Ray directions of the vision cone, relative to the agent's heading
+RAY_OFFSETS = np.radians(np.linspace(-VISION_ANGLE/2, VISION_ANGLE/2, 5))
+HALF_CONE = np.radians(VISION_ANGLE/2)
+DIAGONAL = np.sqrt(WINDOW_WIDTH**2 + WINDOW_HEIGHT**2)
+DIRECT_SCAN_PAIRS = 1 << 16  # Query x target pairs up to which a plain distance scan beats a grid
+DIRECT_SCAN_TARGETS = 32  # Target sets this small are always scanned directly
+
+def nearest(grid, qx, qy, accept=None):
+    """Index of and distance to the nearest indexed point for each query
+
+    Searches the grid in growing radii until every query has a hit or the
+    whole world is covered. `accept(query, points)` can reject candidate
+    pairs. Misses get (-1, inf). Ties keep the lowest point index, like the
+    strict `<` scans in Agent.get_inputs.
+    """
+    target = np.full(len(qx), -1)
+    dist = np.full(len(qx), np.inf)
+    pending = np.arange(len(qx))
+    radius = VISION_RANGE
+    while len(pending):
+        q, p, d = grid.query_within(qx[pending], qy[pending], radius)
+        if accept is not None:
+            keep = accept(pending[q], p)
+            q, p, d = q[keep], p[keep], d[keep]
+        if len(q):
+            order = np.lexsort((p, d, q))
+            q, p, d = q[order], p[order], d[order]
+            first = np.ones(len(q), dtype=bool)
+            first[1:] = q[1:] != q[:-1]
+            target[pending[q[first]]] = p[first]
+            dist[pending[q[first]]] = d[first]
+        if radius > DIAGONAL:
+            break
+        pending = pending[target[pending] < 0]
+        radius *= 2
+    return target, dist
+
+def nearest_among(x, y, targets, qx, qy, grid=None):
+    """Index of and distance to the nearest of the points `targets` for each query
+
+    `targets` are increasing indices into the coordinate arrays `x` and `y`.
+    Small target sets are scanned directly in query chunks, which avoids
+    widening grid searches across a sparse world. Larger ones are searched
+    in `grid`, which must index exactly `targets`, or in a grid built here.
+    Same results and tie rule as nearest().
+    """
+    if len(targets) == 0:
+        return np.full(len(qx), -1), np.full(len(qx), np.inf)
+    if len(targets) > DIRECT_SCAN_TARGETS and len(qx) * len(targets) > DIRECT_SCAN_PAIRS:
+        if grid is None:
+            grid = SpatialGrid()
+            grid.build(np.column_stack((x, y)), points=targets)
+        return nearest(grid, qx, qy)
+
+    tx = x[targets]
+    ty = y[targets]
+    target = np.empty(len(qx), dtype=int)
+    dist = np.empty(len(qx))
+    step = max(1, DIRECT_SCAN_PAIRS // len(targets))
+    for start in range(0, len(qx), step):
+        chunk = slice(start, start + step)
+        d = np.sqrt((tx[None, :] - qx[chunk, None])**2 + (ty[None, :] - qy[chunk, None])**2)
+        first = d.argmin(axis=1)  # Lowest index among equal distances
+        target[chunk] = targets[first]
+        dist[chunk] = d[np.arange(len(first)), first]
+    return target, dist
+
+def vision(grid, x, y, headings):
+    """Closest food along each vision ray, normalized by VISION_RANGE
+
+    Mirrors Agent.get_vision_inputs, including its unwrapped angle difference,
+    but only looks at food the grid finds within VISION_RANGE.
+    """
+    closest = np.full((len(x), len(RAY_OFFSETS)), float(VISION_RANGE))
+    q, p, d = grid.query_within(x, y, VISION_RANGE)
+    angle_to = np.arctan2(grid.xy[p, 1] - y[q], grid.xy[p, 0] - x[q])
+    ray_angle = headings[q][:, None] + RAY_OFFSETS[None, :]
+    in_cone = np.abs(angle_to[:, None] - ray_angle) < HALF_CONE
+    pair, ray = np.nonzero(in_cone)
+    np.minimum.at(closest, (q[pair], ray), d[pair])
+    return closest / VISION_RANGE
+
+def sense(state, food_xy, food_grid=None, active=None, rows=None):
+    """Compute the network inputs (size x NUM_INPUTS) for every active agent
+
+    Gives the same values as calling Agent.get_inputs on each agent in turn.
+    `food_grid` must index `food_xy`; it is built here when not supplied.
+    Rows of inactive agents are left at zero. With `rows`, indices of
+    living agents, only those are sensed and the result has one row per
+    entry of `rows`.
+    """
+    if food_grid is None:
+        food_grid = SpatialGrid()
+        food_grid.build(food_xy)
+
+    if rows is None:
+        inputs = np.zeros((state.size, NUM_INPUTS))
+        mask = state.alive if active is None else state.alive & active
+        idx = at = np.flatnonzero(mask)
+    else:
+        inputs = np.zeros((len(rows), NUM_INPUTS))
+        idx = rows
+        at = slice(None)
+    if len(idx) == 0:
+        return inputs
+    x = state.x[idx]
+    y = state.y[idx]
+
+    # Nearest food
+    food, food_dist = nearest_among(food_xy[:, 0], food_xy[:, 1], np.sort(food_grid.order),
+                                    x, y, food_grid)
+    has_food = food >= 0
+    hit = np.flatnonzero(has_food)
+    food_angle = np.zeros(len(idx))
+    food_angle[hit] = np.arctan2(food_xy[food[hit], 1] - y[hit], food_xy[food[hit], 0] - x[hit])
+    inputs[at, 0] = np.where(has_food, food_dist / DIAGONAL, 1.0)
+    inputs[at, 1] = np.where(has_food, food_angle / (2 * np.pi), 0.0)
+
+    # Nearest living agent of the opposite type, searched among that type only
+    living = np.flatnonzero(state.alive)
+    other = np.full(len(idx), -1)
+    agent_dist = np.full(len(idx), np.inf)
+    for predators in (False, True):
+        query = np.flatnonzero(state.is_predator[idx] == predators)
+        targets = living[state.is_predator[living] != predators]
+        other[query], agent_dist[query] = nearest_among(state.x, state.y, targets,
+                                                         x[query], y[query])
+    has_agent = other >= 0
+    hit = np.flatnonzero(has_agent)
+    agent_angle = np.zeros(len(idx))
+    agent_angle[hit] = np.arctan2(state.y[other[hit]] - y[hit], state.x[other[hit]] - x[hit])
+    inputs[at, 2] = np.where(has_agent, agent_dist / DIAGONAL, 1.0)
+    inputs[at, 3] = np.where(has_agent, agent_angle / (2 * np.pi), 0.0)
+
+    # Vision rays
+    inputs[at, 4:4 + len(RAY_OFFSETS)] = vision(food_grid, x, y, state.angle[idx])
+
+    # Memory inputs
+    inputs[at, 9:9 + MEMORY_SIZE] = state.memory[idx]
+
+    # Current state
+    inputs[at, 9 + MEMORY_SIZE] = state.energy[idx] / state.max_energy[idx]
+    inputs[at, 10 + MEMORY_SIZE] = state.speed[idx] / state.max_speed[idx]
+    return inputs
@@ -0,0 +1,333 @@
+import random
+import numpy as np
+import neat
+from agent import Agent
+from environment import Environment
+from world import AgentState
+from sensing import sense
+from batch_nn import BatchNetwork
+from network_cache import NetworkCache
+from speciation import SpeciatedPopulation
+from profiling import PhaseProfiler
+from spatial import SpatialGrid, first_claims
+from config import *
+
+def create_agents(config, prey_genomes, predator_genomes, state=None):
+    """Place agents for the given genomes at random positions in one AgentState"""
+    if state is None:
+        state = AgentState(len(prey_genomes) + len(predator_genomes))
+    agents = []
+    # Create prey
+    for genome in prey_genomes:
+        x = random.randint(AGENT_RADIUS, WINDOW_WIDTH - AGENT_RADIUS)
+        y = random.randint(AGENT_RADIUS, WINDOW_HEIGHT - AGENT_RADIUS)
+        agents.append(Agent(x, y, genome, config, is_predator=False,
+                            state=state, index=len(agents)))
+
+    # Create predators
+    for genome in predator_genomes:
+        x = random.randint(PREDATOR_RADIUS, WINDOW_WIDTH - PREDATOR_RADIUS)
+        y = random.randint(PREDATOR_RADIUS, WINDOW_HEIGHT - PREDATOR_RADIUS)
+        agents.append(Agent(x, y, genome, config, is_predator=True,
+                            state=state, index=len(agents)))
+
+    return agents
+
+def load_config(path='config.txt'):
+    """Load the NEAT configuration used by the simulation"""
+    return neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                       neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                       path)
+
+class Simulation:
+    """Predator/prey world that can be stepped with or without a display"""
+
+    def __init__(self, config, seed=None, genomes=None, profiler=None, metrics=None,
+                 network_cache=None, recorder=None, hall_of_fame=None):
+        self.config = config
+        self.profiler = profiler if profiler is not None else PhaseProfiler()
+        self.metrics = metrics
+        self.recorder = recorder
+        self.hall_of_fame = hall_of_fame
+        self.seed = seed
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
+        self.generation = 0
+        self.ticks = 0
+        self.generation_start = 0
+        self.last_gain = 0
+        self.tick_budget = GENERATION_TICK_BUDGET
+        self.stagnation_ticks = STAGNATION_TICKS
+        self.best_fitness = 0
+        self.avg_fitness = 0
+        self.agents = []
+        self.state = None
+        self.archived = None
+        self.opponents = ([], [])
+        self.networks = None
+        self.network_cache = network_cache if network_cache is not None else NetworkCache(config)
+        self.prey_population = SpeciatedPopulation(config, config.pop_size)
+        self.predator_population = SpeciatedPopulation(config, PREDATOR_COUNT)
+        self.environment = Environment()
+        self.agent_grid = SpatialGrid()
+        if genomes is None:
+            self.reset()
+        else:
+            self.populate(*genomes)
+
+    def reset(self):
+        """Start again from a fresh random population"""
+        self.prey_population = SpeciatedPopulation(self.config, self.config.pop_size)
+        self.predator_population = SpeciatedPopulation(self.config, PREDATOR_COUNT)
+        self.populate(self.prey_population.create(), self.predator_population.create(),
+                      self.sample_opponents())
+        self.generation = 0
+        self.ticks = 0
+        self.generation_start = 0
+        self.last_gain = 0
+        if self.metrics is not None:
+            self.metrics.clear()
+
+    def populate(self, prey_genomes, predator_genomes, opponents=None):
+        """Fill a fresh world with agents for the given genomes
+
+        `opponents` are (prey, predator) genomes from the hall of fame that
+        play alongside the populations but are not bred from.
+        """
+        self.opponents = opponents if opponents is not None else ([], [])
+        past_prey, past_predators = self.opponents
+        self.state = AgentState(len(prey_genomes) + len(past_prey) +
+                                len(predator_genomes) + len(past_predators))
+        self.agents = create_agents(self.config, list(prey_genomes) + list(past_prey),
+                                    list(predator_genomes) + list(past_predators), self.state)
+        self.archived = np.zeros(self.state.size, dtype=bool)
+        self.archived[len(prey_genomes):len(prey_genomes) + len(past_prey)] = True
+        self.archived[self.state.size - len(past_predators):] = True
+        self.state.reindex()
+        self.compile_networks()
+        self.environment.reset()
+
+    def sample_opponents(self):
+        """Archived prey and predators to add to the next generation"""
+        if self.hall_of_fame is None:
+            return [], []
+        return (self.hall_of_fame.sample(False, HALL_OF_FAME_PREY),
+                self.hall_of_fame.sample(True, HALL_OF_FAME_PREDATORS))
+
+    def population(self, predators):
+        """Agents of the evolving prey or predator population, without opponents"""
+        return [a for a in self.agents
+                if a.is_predator == predators and not self.archived[a.index]]
+
+    def step(self):
+        """Advance the world by one tick, returns True when a generation ended"""
+        self.tick()
+        if self.generation_over():
+            self.next_generation()
+            return True
+        return False
+
+    def generation_over(self):
+        """Check if all prey are dead, the tick budget is spent or fitness stalled
+
+        A zero `tick_budget` or `stagnation_ticks` disables that rule.
+        Stagnation means no agent gained fitness for `stagnation_ticks` ticks.
+        """
+        if self.tick_budget and self.ticks - self.generation_start >= self.tick_budget:
+            return True
+        if self.stagnation_ticks and self.ticks - self.last_gain >= self.stagnation_ticks:
+            return True
+        state = self.state
+        return not np.any(~state.is_predator[state.active])
+
+    def tick(self):
+        """Advance the world by one tick without any generation turnover"""
+        profiler = self.profiler
+
+        state = self.state
+
+        # Update environment and agents
+        with profiler.phase('environment'):
+            gained = self.environment.update(state, state.active)
+
+        # Every living agent decides on the same world snapshot, then the
+        # whole population moves in one batched update. Only the active set
+        # is touched, so a tick costs in proportion to the agents still alive.
+        with profiler.phase('sensing'):
+            inputs = sense(state, self.environment.food_positions(),
+                           self.environment.food_grid, rows=state.active)
+        with profiler.phase('activation'):
+            outputs = self.networks.activate(inputs, state.active)
+        with profiler.phase('movement'):
+            state.step(outputs, rows=state.active)
+            state.compact()
+
+        with profiler.phase('predation'):
+            self.index_agents()
+            gained += self.handle_predation()
+            state.compact()
+        self.ticks += 1
+        if gained:
+            self.last_gain = self.ticks
+        if self.recorder is not None:
+            with profiler.phase('recording'):
+                self.recorder.record(self)
+
+    def compile_networks(self):
+        """Compile the current agents' genomes into one batched network
+
+        Genomes seen in an earlier generation come from the network cache.
+        """
+        self.networks = BatchNetwork([agent.genome for agent in self.agents], self.config,
+                                     self.network_cache)
+
+    def index_agents(self):
+        """Rebuild the spatial index of living agents"""
+        state = self.state
+        self.agent_grid.build(np.column_stack((state.x, state.y)), points=state.active)
+
+    def handle_predation(self):
+        """Handle predator-prey interactions, returns the number of prey caught"""
+        state = self.state
+        predators = state.active[state.is_predator[state.active]]
+        hunter, prey, dist = self.agent_grid.query_within(
+            state.x[predators], state.y[predators], 2 * state.radius.max(initial=0))
+        hunter = predators[hunter]
+        caught = (~state.is_predator[prey] & state.alive[prey] &
+                  (dist < state.radius[hunter] + state.radius[prey]))
+
+        # Each prey is taken by the first predator that reaches it
+        hunter, prey = first_claims(hunter[caught], prey[caught])
+        state.alive[prey] = False
+        hunter, kills = np.unique(hunter, return_counts=True)
+        state.fitness[hunter] += 5 * kills
+        state.energy[hunter] += FOOD_ENERGY * kills
+        return len(prey)
+
+    def next_generation(self, immigrants=None):
+        """Breed the next generation from the current agents' fitness
+
+        `immigrants`, optional (prey, predator) genome lists from another
+        population, take the places of the last prey and predator offspring.
+        """
+        if self.recorder is not None:
+            self.recorder.finish()
+        with self.profiler.phase('reproduction'):
+            children = self.breed()
+            if immigrants is not None:
+                for genomes, arrivals, population in zip(
+                        children, immigrants, (self.prey_population, self.predator_population)):
+                    genomes[len(genomes) - len(arrivals):] = population.adopt(arrivals)
+            if self.metrics is not None:
+                self.metrics.record(self.generation, self.state, self.ticks - self.generation_start,
+                                    (self.prey_population.species_count(),
+                                     self.predator_population.species_count()), ~self.archived)
+            self.populate(*children, self.sample_opponents())
+        self.generation_start = self.last_gain = self.ticks
+        self.profiler.end_generation(self.generation)
+        self.generation += 1
+
+    def breed(self):
+        """Child prey and predator genomes bred from the current agents
+
+        Each population is speciated and reproduced by its SpeciatedPopulation.
+        With a hall of fame, the best of both are archived first.
+        """
+        prey = self.population(False)
+        predators = self.population(True)
+
+        # Record how the finished generation did
+        members = prey + predators
+        self.best_fitness = max(a.fitness for a in members)
+        self.avg_fitness = sum(a.fitness for a in members) / len(members)
+        if self.hall_of_fame is not None:
+            self.hall_of_fame.add(self.generation, False, [a.genome for a in prey],
+                                  [a.fitness for a in prey])
+            self.hall_of_fame.add(self.generation, True, [a.genome for a in predators],
+                                  [a.fitness for a in predators])
+
+        prey_children = self.prey_population.reproduce(
+            [a.genome for a in prey], [a.fitness for a in prey])
+        predator_children = self.predator_population.reproduce(
+            [a.genome for a in predators], [a.fitness for a in predators])
+        return prey_children, predator_children
+
+    def snapshot(self):
+        """Everything needed to resume this run exactly, for a checkpoint
+
+        Holds live references, so it must be pickled before the simulation
+        steps again.
+        """
+        return {
+            'generation': self.generation,
+            'ticks': self.ticks,
+            'generation_start': self.generation_start,
+            'last_gain': self.last_gain,
+            'best_fitness': self.best_fitness,
+            'avg_fitness': self.avg_fitness,
+            'prey_genomes': [a.genome for a in self.population(False)],
+            'predator_genomes': [a.genome for a in self.population(True)],
+            'opponents': self.opponents,
+            'state': self.state,
+            'environment': self.environment,
+            'populations': (self.prey_population, self.predator_population),
+            'metrics': self.metrics.snapshot() if self.metrics is not None else None,
+            'random': random.getstate(),
+            'numpy_random': np.random.get_state(),
+        }
+
+    def restore(self, snapshot):
+        """Continue from a snapshot() taken by this or an earlier process"""
+        self.generation = snapshot['generation']
+        self.ticks = snapshot['ticks']
+        self.generation_start = snapshot['generation_start']
+        self.last_gain = snapshot.get('last_gain', self.ticks)
+        self.best_fitness = snapshot['best_fitness']
+        self.avg_fitness = snapshot['avg_fitness']
+        self.prey_population, self.predator_population = snapshot['populations']
+
+        # Rebuild the agents, then put the saved state and food back
+        self.populate(snapshot['prey_genomes'], snapshot['predator_genomes'],
+                      snapshot.get('opponents'))
+        self.state = snapshot['state']
+        self.state.reindex()
+        for agent in self.agents:
+            agent.state = self.state
+        self.environment = snapshot['environment']
+        if self.metrics is not None and snapshot['metrics'] is not None:
+            self.metrics.restore(snapshot['metrics'])
+
+        # Last, since rebuilding the agents drew random positions
+        random.setstate(snapshot['random'])
+        np.random.set_state(snapshot['numpy_random'])
+
+    def evaluate_parallel(self, evaluator):
+        """Play the current generation in worker arenas and merge their fitness"""
+        state = self.state
+        prey = [a.genome for a in self.agents if not a.is_predator]
+        predators = [a.genome for a in self.agents if a.is_predator]
+        prey_fitness, predator_fitness, ticks = evaluator.evaluate(
+            prey, predators, random.getrandbits(32))
+        state.fitness[~state.is_predator] = prey_fitness
+        state.fitness[state.is_predator] = predator_fitness
+        state.alive[:] = False
+        state.compact()
+        self.ticks += ticks
+
+    def run(self, generations, on_generation=None, evaluator=None):
+        """Run a number of generations as fast as possible, without a display
+
+        With a ParallelEvaluator, each generation is played in its worker
+        arenas instead of this world.
+        """
+        target = self.generation + generations
+        while self.generation < target:
+            if evaluator is not None:
+                self.evaluate_parallel(evaluator)
+                self.next_generation()
+                ended = True
+            else:
+                ended = self.step()
+            if ended and on_generation is not None:
+                on_generation(self)
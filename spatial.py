@@ -0,0 +1,82 @@
+import numpy as np
+from config import *
+
+class SpatialGrid:
+    """Uniform-grid spatial index over the world, rebuilt from point arrays"""
+
+    def __init__(self, cell_size=GRID_CELL_SIZE, width=WINDOW_WIDTH, height=WINDOW_HEIGHT):
+        self.cell_size = cell_size
+        self.cols = max(1, int(np.ceil(width / cell_size)))
+        self.rows = max(1, int(np.ceil(height / cell_size)))
+        self.build(np.zeros((0, 2)))
+
+    def cell_coords(self, x, y):
+        """Grid column and row of each point, clamped to the world"""
+        cx = np.clip((np.asarray(x) // self.cell_size).astype(int), 0, self.cols - 1)
+        cy = np.clip((np.asarray(y) // self.cell_size).astype(int), 0, self.rows - 1)
+        return cx, cy
+
+    def build(self, xy, mask=None, points=None):
+        """Index the points in `xy` (n x 2), skipping those where mask is False
+
+        `points` gives the indices to index directly instead of a mask.
+        """
+        self.xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        if points is None:
+            points = np.arange(len(self.xy)) if mask is None else np.flatnonzero(mask)
+        cx, cy = self.cell_coords(self.xy[points, 0], self.xy[points, 1])
+        cells = cy * self.cols + cx
+
+        # Counting sort: points grouped by cell, plus where each cell starts
+        order = np.argsort(cells, kind='stable')
+        self.order = points[order]
+        self.cell_count = np.bincount(cells, minlength=self.rows * self.cols)
+        self.cell_start = np.cumsum(self.cell_count) - self.cell_count
+
+    def query_pairs(self, qx, qy, radius):
+        """Candidate (query, point) index pairs for points within `radius`
+
+        Returns every indexed point in the cells overlapping each query's
+        radius; callers filter the candidates by exact distance.
+        """
+        qx = np.asarray(qx, dtype=float)
+        qy = np.asarray(qy, dtype=float)
+        k = int(np.ceil(radius / self.cell_size))
+        offsets = np.arange(-k, k + 1)
+        cx, cy = self.cell_coords(qx, qy)
+        ncx = cx[:, None, None] + offsets[None, :, None]
+        ncy = cy[:, None, None] + offsets[None, None, :]
+        valid = (ncx >= 0) & (ncx < self.cols) & (ncy >= 0) & (ncy < self.rows)
+        query = np.broadcast_to(np.arange(len(qx))[:, None, None], valid.shape)[valid]
+        cells = (ncy * self.cols + ncx)[valid]
+
+        # Expand every (query, cell) into one pair per point in that cell
+        count = self.cell_count[cells]
+        start = self.cell_start[cells]
+        total = count.sum()
+        within = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        points = self.order[np.repeat(start, count) + within]
+        return np.repeat(query, count), points
+
+    def query_within(self, qx, qy, radius):
+        """(query, point, distance) triples for points closer than `radius`"""
+        query, points = self.query_pairs(qx, qy, radius)
+        dist = np.sqrt((self.xy[points, 0] - np.asarray(qx)[query])**2 +
+                       (self.xy[points, 1] - np.asarray(qy)[query])**2)
+        close = dist < radius
+        return query[close], points[close], dist[close]
+
+def first_claims(claimer, target):
+    """Resolve contested (claimer, target) pairs in loop order
+
+    Each target goes to its lowest-index claimer, matching nested loops with
+    claimers outermost. Returns the surviving pairs.
+    """
+    if len(target) == 0:
+        return claimer, target
+    order = np.lexsort((claimer, target))
+    claimer = claimer[order]
+    target = target[order]
+    first = np.ones(len(target), dtype=bool)
+    first[1:] = target[1:] != target[:-1]
+    return claimer[first], target[first]
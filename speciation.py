@@ -0,0 +1,290 @@
+import copy
+import numpy as np
+import neat
+from neat.species import Species
+
+def connection_code(key):
+    """Single sortable integer for a connection key (input node, output node)"""
+    # Input nodes are negative, every other node key is >= 0
+    return (key[0] << 32) + key[1]
+
+class EncodedGenome:
+    """A genome's node and connection genes as arrays sorted by key"""
+
+    def __init__(self, genome, categories):
+        nodes = sorted(genome.nodes.items())
+        self.node_keys = np.array([key for key, _ in nodes], dtype=np.int64)
+        self.node_values = np.array([(ng.bias, ng.response) for _, ng in nodes]).reshape(-1, 2)
+        self.node_kinds = np.array([(categories.setdefault(ng.activation, len(categories)),
+                                     categories.setdefault(ng.aggregation, len(categories)))
+                                    for _, ng in nodes], dtype=np.int64).reshape(-1, 2)
+        connections = sorted((connection_code(key), cg.weight, cg.enabled)
+                             for key, cg in genome.connections.items())
+        self.connection_keys = np.array([c[0] for c in connections], dtype=np.int64)
+        self.weights = np.array([c[1] for c in connections])
+        self.enabled = np.array([c[2] for c in connections], dtype=bool)
+
+class GeneTable:
+    """Genes of a set of genomes, concatenated genome by genome
+
+    Within each genome's stretch the keys are sorted, so genes homologous
+    to a reference genome are found with one searchsorted over all of them.
+    """
+
+    def __init__(self, keys, values, categorical):
+        # keys: one sorted key array per genome; values/categorical: matching rows
+        self.sizes = np.array([len(k) for k in keys], dtype=np.int64)
+        self.starts = np.concatenate(([0], np.cumsum(self.sizes)))
+        self.rows = np.repeat(np.arange(len(keys)), self.sizes)
+        self.keys = np.concatenate(keys)
+        self.values = np.concatenate(values)
+        self.categorical = np.concatenate(categorical)
+
+    def distances(self, ref, disjoint_coefficient, weight_coefficient):
+        """Distance term between genome `ref` and every genome, as in neat's genome distance"""
+        n = len(self.sizes)
+        lo, hi = self.starts[ref], self.starts[ref + 1]
+        if hi > lo:
+            pos = np.minimum(np.searchsorted(self.keys[lo:hi], self.keys), hi - lo - 1)
+            match = self.keys[lo:hi][pos] == self.keys
+            other = lo + pos[match]
+            diff = (np.abs(self.values[match] - self.values[other]).sum(axis=1) +
+                    (self.categorical[match] != self.categorical[other]).sum(axis=1))
+            homologous = np.bincount(self.rows[match], weights=diff, minlength=n) * weight_coefficient
+            matches = np.bincount(self.rows[match], minlength=n)
+        else:
+            homologous = np.zeros(n)
+            matches = np.zeros(n, dtype=np.int64)
+        disjoint = self.sizes + self.sizes[ref] - 2 * matches
+        largest = np.maximum(self.sizes, self.sizes[ref])
+        return np.where(largest > 0,
+                        (homologous + disjoint_coefficient * disjoint) / np.maximum(largest, 1), 0.0)
+
+class CompatibilityDistance:
+    """Batched NEAT compatibility distance
+
+    Each genome is encoded once as sorted key arrays of its node and
+    connection genes and kept while it is still in use, so elites and
+    species representatives aren't re-encoded every generation. For a set
+    of genomes the encodings are concatenated into gene tables, and the
+    distance from one genome to all the others is a few array operations.
+    Matches neat's DefaultGenome.distance up to float rounding.
+    """
+
+    def __init__(self, genome_config):
+        self.disjoint_coefficient = genome_config.compatibility_disjoint_coefficient
+        self.weight_coefficient = genome_config.compatibility_weight_coefficient
+        self.categories = {}  # Activation/aggregation name -> number
+        self.encoded = {}  # Genome key -> EncodedGenome
+
+    def encode(self, genomes):
+        """Encodings of `genomes`, reusing the ones already made"""
+        encoded = []
+        for genome in genomes:
+            e = self.encoded.get(genome.key)
+            if e is None:
+                e = self.encoded[genome.key] = EncodedGenome(genome, self.categories)
+            encoded.append(e)
+        return encoded
+
+    def retain(self, genomes):
+        """Forget the encodings of every genome not in `genomes`"""
+        self.encoded = {genome.key: self.encoded[genome.key] for genome in genomes
+                        if genome.key in self.encoded}
+
+    def table(self, genomes):
+        """Gene tables (nodes, connections) for a list of genomes"""
+        encoded = self.encode(genomes)
+        nodes = GeneTable([e.node_keys for e in encoded], [e.node_values for e in encoded],
+                          [e.node_kinds for e in encoded])
+        connections = GeneTable([e.connection_keys for e in encoded],
+                                [e.weights[:, None] for e in encoded],
+                                [e.enabled[:, None].astype(np.int64) for e in encoded])
+        return nodes, connections
+
+    def from_row(self, tables, ref):
+        """Distance from genome `ref` of the tables to every genome in them"""
+        nodes, connections = tables
+        return (nodes.distances(ref, self.disjoint_coefficient, self.weight_coefficient) +
+                connections.distances(ref, self.disjoint_coefficient, self.weight_coefficient))
+
+    def distance(self, genome0, genome1):
+        return self.from_row(self.table([genome0, genome1]), 0)[1]
+
+class VectorSpeciesSet(neat.DefaultSpeciesSet):
+    """DefaultSpeciesSet whose speciation uses CompatibilityDistance
+
+    Same algorithm as neat's speciate: existing species pick the closest
+    genome to their old representative, then the remaining genomes join
+    the closest species under the compatibility threshold or found a new
+    one. Each representative's distances to the whole population are
+    computed in one batch instead of pair by pair.
+    """
+
+    def __init__(self, config, reporters):
+        super().__init__(config, reporters)
+        self.distance = None
+
+    def speciate(self, config, population, generation):
+        assert isinstance(population, dict)
+        if self.distance is None:
+            self.distance = CompatibilityDistance(config.genome_config)
+        threshold = self.species_set_config.compatibility_threshold
+
+        genomes = list(population.values())
+        old_species = list(self.species.items())
+        # Old representatives are appended as extra rows after the population
+        tables = self.distance.table(genomes + [s.representative for _, s in old_species])
+        self.distance.retain(genomes)
+        n = len(genomes)
+        computed = []
+
+        # Find the best representatives for each existing species
+        unspeciated = np.ones(n, dtype=bool)  # Not yet taken as a representative
+        representatives = []  # (species id, population row)
+        for i, (sid, s) in enumerate(old_species):
+            if not unspeciated.any():
+                break
+            d = self.distance.from_row(tables, n + i)[:n]
+            computed.append(d[unspeciated])
+            rep = int(np.argmin(np.where(unspeciated, d, np.inf)))
+            representatives.append((sid, rep))
+            unspeciated[rep] = False
+
+        # Visit the rest in the order neat's set-based loop would
+        remaining = set(population)
+        for _, rep in representatives:
+            remaining.remove(genomes[rep].key)
+        row = {genome.key: g for g, genome in enumerate(genomes)}
+        order = np.array([row[key] for key in remaining], dtype=np.int64)
+
+        # Each genome joins its closest representative, earliest species on
+        # ties. Only a genome that founds a new species changes the choice of
+        # the genomes after it, so assignment is done in bulk between founders.
+        best = np.full(n, np.inf)
+        choice = np.full(n, -1)
+        for s_index, (_, rep) in enumerate(representatives):
+            d = self.distance.from_row(tables, rep)[:n]
+            computed.append(d)
+            closer = d < best
+            best[closer] = d[closer]
+            choice[closer] = s_index
+        members = {sid: [rep] for sid, rep in representatives}
+        start = 0
+        while start < len(order):
+            rest = order[start:]
+            founders = np.flatnonzero(best[rest] >= threshold)
+            end = start + founders[0] if len(founders) else len(order)
+            for g in order[start:end]:
+                members[representatives[choice[g]][0]].append(g)
+            if end == len(order):
+                break
+            # No species is similar enough: this genome founds a new one
+            g = order[end]
+            sid = next(self.indexer)
+            representatives.append((sid, g))
+            members[sid] = [g]
+            d = self.distance.from_row(tables, g)[:n]
+            computed.append(d)
+            closer = d < best
+            best[closer] = d[closer]
+            choice[closer] = len(representatives) - 1
+            start = end + 1
+
+        # Update species collection based on new speciation
+        self.genome_to_species = {}
+        for sid, rep in representatives:
+            s = self.species.get(sid)
+            if s is None:
+                s = Species(sid, generation)
+                self.species[sid] = s
+            member_dict = {}
+            for g in members[sid]:
+                genome = genomes[g]
+                self.genome_to_species[genome.key] = sid
+                member_dict[genome.key] = genome
+            s.update(genomes[rep], member_dict)
+        # Species that found no representative in this population are gone
+        for sid in set(self.species) - set(members):
+            del self.species[sid]
+
+        if computed:
+            values = np.concatenate(computed)
+            self.reporters.info('Mean genetic distance {0:.3f}, standard deviation {1:.3f}'.format(
+                values.mean(), values.std()))
+
+class SpeciatedPopulation:
+    """One evolving population with neat's speciation, stagnation and reproduction
+
+    Uses the [DefaultSpeciesSet], [DefaultStagnation] and
+    [DefaultReproduction] settings of the NEAT config. For very small
+    populations (the predators) elitism and the minimum species size are
+    scaled down so that offspring are still produced every generation.
+    """
+
+    def __init__(self, config, size):
+        self.config = config
+        self.size = size
+        self.generation = 0
+        self.reporters = neat.reporting.ReporterSet()
+        self.stagnation = config.stagnation_type(config.stagnation_config, self.reporters)
+        reproduction_config = copy.copy(config.reproduction_config)
+        reproduction_config.elitism = min(reproduction_config.elitism, size // 4)
+        reproduction_config.min_species_size = min(reproduction_config.min_species_size,
+                                                   max(1, size // 2))
+        self.reproduction = config.reproduction_type(reproduction_config, self.reporters,
+                                                     self.stagnation)
+        self.species_set = VectorSpeciesSet(config.species_set_config, self.reporters)
+
+    def create(self):
+        """A fresh random population"""
+        return list(self.reproduction.create_new(self.config.genome_type,
+                                                 self.config.genome_config, self.size).values())
+
+    def adopt(self, genomes):
+        """Give genomes from another population fresh keys from this one
+
+        Hidden nodes are renumbered too: every process hands out node keys
+        from its own genome_config.node_indexer, so a migrant's hidden node
+        keys could otherwise be drawn again here when a descendant of it
+        gains a node. Connection keys are rewritten to match.
+        """
+        genome_config = self.config.genome_config
+        outputs = set(genome_config.output_keys)
+        for genome in genomes:
+            genome.key = next(self.reproduction.genome_indexer)
+            nodes = {key: ng for key, ng in genome.nodes.items() if key in outputs}
+            renamed = {}
+            for key in sorted(set(genome.nodes) - outputs):
+                ng = genome.nodes[key]
+                ng.key = renamed[key] = genome_config.get_new_node_key(nodes)
+                nodes[ng.key] = ng
+            connections = {}
+            for (i, o), cg in genome.connections.items():
+                cg.key = (renamed.get(i, i), renamed.get(o, o))
+                connections[cg.key] = cg
+            genome.nodes = nodes
+            genome.connections = connections
+        return genomes
+
+    def species_count(self):
+        return len(self.species_set.species)
+
+    def reproduce(self, genomes, fitness):
+        """Speciate the evaluated genomes and breed the next generation from them"""
+        for genome, f in zip(genomes, fitness):
+            genome.fitness = float(f)
+        population = {genome.key: genome for genome in genomes}
+        # Only the newest generation's parentage is kept, so checkpoints stay small
+        self.reproduction.ancestors.clear()
+        self.species_set.speciate(self.config, population, self.generation)
+        children = self.reproduction.reproduce(self.config, self.species_set,
+                                               self.size, self.generation)
+        if not children:
+            # Every species stagnated
+            if not self.config.reset_on_extinction:
+                raise neat.CompleteExtinctionException()
+            children = self.reproduction.create_new(self.config.genome_type,
+                                                    self.config.genome_config, self.size)
+        self.generation += 1
+        return list(children.values())
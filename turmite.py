@@ -0,0 +1,163 @@
+"""
+Multi-ant, multi-colour turmite engine.
+
+A rule string gives the turn for each cell colour: R (right), L (left),
+N (no turn) or U (u-turn). "RL" is Langton's ant. An ant reads its cell,
+turns, advances the cell to the next colour and steps forward on a torus.
+Ants of one world share its grid, and every world can have its own rule.
+
+Headless sweep of a rule space:
+
+    python turmite.py --rules RL RLR LLRR --seeds 0 1 2 --ants 100 --steps 20000 --workers 4
+"""
+import json
+import argparse
+import colorsys
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+TURNS = {'R': 1, 'L': -1, 'N': 0, 'U': 2}
+
+# Movement per direction: 0: up, 1: right, 2: down, 3: left
+DX = np.array([0, 1, 0, -1])
+DY = np.array([-1, 0, 1, 0])
+
+def parse_rule(rule):
+    """Turn per colour for a rule string such as "LLRR" """
+    rule = rule.upper()
+    if not 2 <= len(rule) <= 255 or any(c not in TURNS for c in rule):
+        raise ValueError(f"Invalid turmite rule {rule!r}: use 2-255 of the letters {''.join(TURNS)}")
+    return np.array([TURNS[c] for c in rule], dtype=np.int64)
+
+def palette(colours):
+    """RGB colour per cell state: white for 0, then evenly spaced hues"""
+    colors = [(255, 255, 255)]
+    for i in range(colours - 1):
+        r, g, b = colorsys.hsv_to_rgb(i / max(1, colours - 1), 0.8, 0.9 if colours > 2 else 0.0)
+        colors.append((int(r * 255), int(g * 255), int(b * 255)))
+    return np.array(colors, dtype=np.uint8)
+
+class Turmites:
+    """Many ants on toroidal grids, all advanced per step with NumPy
+
+    `rules` is one rule string or a list with one per world. Every world has
+    `ants` ants sharing its `size` x `size` grid. A single ant starts in the
+    centre facing up like the classic ant; more ants are placed randomly
+    from the world's seed. Ants on the same cell all read its colour, and
+    the cell then advances once per ant.
+    """
+
+    def __init__(self, rules, ants=1, size=200, seeds=None):
+        if isinstance(rules, str):
+            rules = [rules]
+        self.rules = [rule.upper() for rule in rules]
+        worlds = len(self.rules)
+        if seeds is None or np.isscalar(seeds):
+            seeds = [seeds] * worlds
+        self.size = size
+        self.worlds = worlds
+        self.ants = ants
+        self.steps = 0
+
+        parsed = [parse_rule(rule) for rule in self.rules]
+        self.colours = np.array([len(turns) for turns in parsed])
+        self.turns = np.zeros((worlds, self.colours.max()), dtype=np.int64)
+        for w, turns in enumerate(parsed):
+            self.turns[w, :len(turns)] = turns
+
+        self.grid = np.zeros((worlds, size, size), dtype=np.uint8)
+        self.x = np.zeros((worlds, ants), dtype=np.int64)
+        self.y = np.zeros((worlds, ants), dtype=np.int64)
+        self.direction = np.zeros((worlds, ants), dtype=np.int64)
+        for w, seed in enumerate(seeds):
+            if ants == 1:
+                self.x[w] = self.y[w] = size // 2
+            else:
+                rng = np.random.default_rng(seed)
+                self.x[w] = rng.integers(0, size, ants)
+                self.y[w] = rng.integers(0, size, ants)
+                self.direction[w] = rng.integers(0, 4, ants)
+        self.world = np.repeat(np.arange(worlds)[:, None], ants, axis=1)
+        self.ant_colours = self.colours[self.world]
+
+    def step(self):
+        """Advance every ant in every world by one step"""
+        cells = self.grid.reshape(-1)
+        flat = (self.world * self.size + self.y) * self.size + self.x
+        colour = cells[flat]
+        self.direction = (self.direction + self.turns[self.world, colour]) & 3
+        if self.ants == 1:
+            cells[flat] = (colour + 1) % self.ant_colours
+        else:
+            # Several ants may share a cell: advance it once per ant
+            _, inverse, counts = np.unique(flat, return_inverse=True, return_counts=True)
+            cells[flat] = (colour + counts[inverse].reshape(flat.shape)) % self.ant_colours
+        self.x = (self.x + DX[self.direction]) % self.size
+        self.y = (self.y + DY[self.direction]) % self.size
+        self.steps += 1
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.step()
+
+    def stats(self):
+        """Summary of every world: coloured cells, colour counts and extent"""
+        results = []
+        for w in range(self.worlds):
+            grid = self.grid[w]
+            rows = np.flatnonzero(grid.any(axis=1))
+            cols = np.flatnonzero(grid.any(axis=0))
+            results.append({
+                'rule': self.rules[w],
+                'steps': self.steps,
+                'ants': self.ants,
+                'coloured_cells': int(np.count_nonzero(grid)),
+                'colour_counts': np.bincount(grid.reshape(-1), minlength=self.colours[w]).tolist(),
+                'extent': [int(cols[-1] - cols[0] + 1) if len(cols) else 0,
+                           int(rows[-1] - rows[0] + 1) if len(rows) else 0],
+            })
+        return results
+
+def run_batch(jobs, ants, size, steps):
+    """Run (rule, seed) jobs as the worlds of one batched Turmites"""
+    rules = [rule for rule, _ in jobs]
+    seeds = [seed for _, seed in jobs]
+    turmites = Turmites(rules, ants, size, seeds)
+    turmites.run(steps)
+    results = turmites.stats()
+    for result, seed in zip(results, seeds):
+        result['seed'] = seed
+    return results
+
+def sweep(rules, seeds, ants=1, size=200, steps=10000, workers=None, batch_size=16):
+    """Run every rule/seed combination headless, in batches across worker processes"""
+    jobs = [(rule, seed) for rule in rules for seed in seeds]
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_batch, batch, ants, size, steps) for batch in batches]
+        return [result for future in futures for result in future.result()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless turmite rule sweep")
+    parser.add_argument('--rules', nargs='+', default=['RL'])
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0])
+    parser.add_argument('--ants', type=int, default=1)
+    parser.add_argument('--size', type=int, default=200)
+    parser.add_argument('--steps', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=16,
+                        help="rule/seed combinations stepped together in one process")
+    parser.add_argument('--output', default=None, help="write results as JSON")
+    args = parser.parse_args()
+
+    results = sweep(args.rules, args.seeds, args.ants, args.size, args.steps,
+                    args.workers, args.batch_size)
+    for r in results:
+        print(f"{r['rule']:>10s} seed {r['seed']}: {r['coloured_cells']} coloured cells, "
+              f"extent {r['extent'][0]}x{r['extent'][1]}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
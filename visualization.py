@@ -1,85 +1,169 @@
 import pygame
 import numpy as np
-import matplotlib.pyplot as plt
 from config import *
+from metrics import LogPlotter
+from neat.graphs import feed_forward_layers
+from renderer import COLORKEY, Renderer, TextCache
+
+NODE_RADIUS = 5
+
+def network_layout(genome, genome_config, width, height):
+    """Node positions in a width x height panel, one column per depth
+
+    Inputs are in the first column and outputs in the last, hidden nodes in
+    between by their depth in the feed-forward evaluation order. Hidden
+    nodes that don't feed an output go in the first hidden column.
+    """
+    connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+    layers = feed_forward_layers(genome_config.input_keys, genome_config.output_keys, connections)
+    outputs = set(genome_config.output_keys)
+    depth = {}
+    for i, layer in enumerate(layers):
+        for node in layer:
+            if node not in outputs:
+                depth[node] = i + 1
+    hidden_columns = max(depth.values(), default=0)
+    for node in genome.nodes:
+        if node not in outputs and node not in depth:
+            depth[node] = 1
+            hidden_columns = max(hidden_columns, 1)
+
+    columns = [list(genome_config.input_keys)]
+    columns += [sorted(n for n, d in depth.items() if d == c) for c in range(1, hidden_columns + 1)]
+    columns.append(list(genome_config.output_keys))
+
+    positions = {}
+    margin = NODE_RADIUS + 1
+    for c, nodes in enumerate(columns):
+        px = margin + c * (width - 2 * margin) / (len(columns) - 1)
+        for j, node in enumerate(nodes):
+            py = margin + (j + 0.5) * (height - 2 * margin) / len(nodes)
+            positions[node] = (int(px), int(py))
+    return positions
+
+def render_network(genome, genome_config, width, height):
+    """Transparent surface with the genome's network
+
+    Connections are green for positive and red for negative weights,
+    brighter and thicker the larger the weight.
+    """
+    surface = pygame.Surface((width, height))
+    surface.fill(COLORKEY)
+    surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    positions = network_layout(genome, genome_config, width, height)
+
+    enabled = [cg for cg in genome.connections.values() if cg.enabled]
+    scale = max([abs(cg.weight) for cg in enabled], default=0) or 1
+    for cg in sorted(enabled, key=lambda cg: abs(cg.weight)):
+        strength = abs(cg.weight) / scale
+        shade = int(60 + 195 * strength)
+        color = (40, shade, 40) if cg.weight > 0 else (shade, 40, 40)
+        start, end = positions[cg.key[0]], positions[cg.key[1]]
+        pygame.draw.line(surface, color, start, end, 1 + int(2 * strength))
+
+    outputs = set(genome_config.output_keys)
+    for node, pos in positions.items():
+        if node < 0:
+            color = (200, 200, 200)
+        elif node in outputs:
+            color = (255, 255, 255)
+        else:
+            color = (100, 150, 255)
+        pygame.draw.circle(surface, color, pos, NODE_RADIUS)
+    return surface
 
 class Visualizer:
-    def __init__(self, screen):
+    """Stats, network panel and overlays drawn over the world in the window
+
+    Fonts need pygame.init(), so the text cache is only made on first draw.
+    """
+
+    def __init__(self, screen, renderer=None):
         self.screen = screen
-        self.font = pygame.font.Font(None, 36)
-        self.stats_font = pygame.font.Font(None, 24)
+        self.renderer = renderer if renderer is not None else Renderer(screen)
+        self._text = None
         self.generation = 0
         self.best_fitness = 0
         self.avg_fitness = 0
-        self.fitness_history = []
-        self.avg_fitness_history = []
+        self.best_index = None
+        self.network_genome = None
+        self.network_surface = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = TextCache(pygame.font.Font(None, 24))
+        return self._text
+
+    def draw_stats(self, state, members=None):
+        """Draw simulation statistics for an AgentState
 
-    def draw_stats(self, agents):
-        """Draw simulation statistics"""
+        `members` optionally masks the agents to count, leaving out
+        hall-of-fame opponents.
+        """
+        if members is None:
+            members = np.ones(state.size, dtype=bool)
         # Calculate statistics
-        alive_count = sum(1 for agent in agents if agent.alive)
-        self.best_fitness = max(agent.fitness for agent in agents)
-        self.avg_fitness = sum(agent.fitness for agent in agents) / len(agents)
-        
-        # Update history
-        self.fitness_history.append(self.best_fitness)
-        self.avg_fitness_history.append(self.avg_fitness)
+        fitness = state.fitness[members]
+        alive_count = np.count_nonzero(state.alive & members)
+        self.best_fitness = fitness.max(initial=0)
+        self.avg_fitness = fitness.mean() if len(fitness) else 0
         
         # Draw text
         texts = [
             f"Generation: {self.generation}",
-            f"Alive: {alive_count}/{len(agents)}",
+            f"Alive: {alive_count}/{len(fitness)}",
             f"Best Fitness: {self.best_fitness:.1f}",
             f"Avg Fitness: {self.avg_fitness:.1f}"
         ]
         
         for i, text in enumerate(texts):
-            surface = self.stats_font.render(text, True, (255, 255, 255))
-            self.screen.blit(surface, (10, 10 + i * 25))
+            self.renderer.blit(self.text.render(('stats', i), text), (10, 10 + i * 25))
+
+    def best_agent(self, agents, state, members=None):
+        """Fittest agent among `members` (default all), kept until another overtakes it
+
+        Ties leave the current choice alone, so the network panel doesn't
+        jump between equally fit agents from frame to frame.
+        """
+        fitness = state.fitness if members is None else np.where(members, state.fitness, -np.inf)
+        best = int(fitness.argmax())
+        current = self.best_index
+        if current is None or current >= len(agents) or fitness[best] > fitness[current]:
+            self.best_index = current = best
+        return agents[current]
 
     def draw_neural_network(self, agent, x, y, width, height):
-        """Draw a simplified visualization of the agent's neural network"""
+        """Draw the agent's genome: its real nodes and enabled connections
+
+        The panel is rendered once per genome and then blitted as is.
+        """
         if not agent.alive:
             return
+        if agent.genome is not self.network_genome:
+            self.network_genome = agent.genome
+            self.network_surface = render_network(agent.genome, agent.config.genome_config,
+                                                  width, height)
+        self.renderer.blit(self.network_surface, (x, y))
 
-        # Draw nodes
-        node_radius = 5
-        layer_sizes = [NUM_INPUTS, 4, NUM_OUTPUTS]  # Simplified network structure
-        layer_positions = []
-        
-        for i, size in enumerate(layer_sizes):
-            layer_x = x + (i * width) / (len(layer_sizes) - 1)
-            layer_positions.append([])
-            
-            for j in range(size):
-                node_y = y + (j * height) / (size - 1) if size > 1 else y + height/2
-                layer_positions[i].append((layer_x, node_y))
-                pygame.draw.circle(self.screen, (200, 200, 200), 
-                                 (int(layer_x), int(node_y)), node_radius)
-
-        # Draw connections
-        for i in range(len(layer_sizes) - 1):
-            for j in range(layer_sizes[i]):
-                for k in range(layer_sizes[i + 1]):
-                    start = layer_positions[i][j]
-                    end = layer_positions[i + 1][k]
-                    pygame.draw.line(self.screen, (100, 100, 100), 
-                                   (int(start[0]), int(start[1])),
-                                   (int(end[0]), int(end[1])), 1)
-
-    def plot_fitness_history(self):
-        """Plot fitness history using matplotlib"""
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.fitness_history, label='Best Fitness')
-        plt.plot(self.avg_fitness_history, label='Average Fitness')
-        plt.xlabel('Generation')
-        plt.ylabel('Fitness')
-        plt.title('Fitness Evolution')
-        plt.legend()
-        plt.grid(True)
-        plt.savefig('fitness_history.png')
-        plt.close()
+    def draw_speed(self, label, steps):
+        """Draw the fast-forward speed and ticks run this frame"""
+        surface = self.text.render('speed', f"Speed: {label} ({steps} ticks/frame)")
+        self.renderer.blit(surface, (10, 110))
+
+    def draw_profile(self, profiler):
+        """Draw the rolling mean time of each profiled phase"""
+        summary = profiler.summary()
+        y = WINDOW_HEIGHT - 10 - 20 * len(summary)
+        for i, (name, ms) in enumerate(sorted(summary.items())):
+            surface = self.text.render(('profile', name), f"{name}: {ms:.2f} ms", (255, 255, 0))
+            self.renderer.blit(surface, (10, y + i * 20))
+
+    def plot_fitness_history(self, log_path):
+        """Plot the per-generation fitness recorded in a metrics log"""
+        LogPlotter(log_path).render()
 
     def increment_generation(self):
         """Increment generation counter"""
-        self.generation += 1 
\ No newline at end of file
+        self.generation += 1
+        self.best_index = None 
\ No newline at end of file
@@ -0,0 +1,95 @@
+import numpy as np
+from config import *
+
+class AgentState:
+    """Struct-of-arrays storage for every agent in the world
+
+    `active` holds the indices of the living agents in increasing order.
+    It is rebuilt by reindex() and shrunk by compact() as agents die, so
+    per-tick work can follow the living agents instead of every slot.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.x = np.zeros(size)
+        self.y = np.zeros(size)
+        self.angle = np.zeros(size)
+        self.speed = np.zeros(size)
+        self.energy = np.zeros(size)
+        self.fitness = np.zeros(size)
+        self.alive = np.zeros(size, dtype=bool)
+        self.memory = np.zeros((size, MEMORY_SIZE))
+        self.is_predator = np.zeros(size, dtype=bool)
+        self.radius = np.zeros(size)
+        self.max_energy = np.zeros(size)
+        self.max_speed = np.zeros(size)
+        self.active = np.zeros(0, dtype=int)
+
+    def init_agent(self, index, x, y, is_predator):
+        """Fill slot `index` with a freshly spawned agent"""
+        self.x[index] = x
+        self.y[index] = y
+        self.angle[index] = 0
+        self.fitness[index] = 0
+        self.alive[index] = True
+        self.memory[index] = 0  # Initialize memory with zeros
+        self.is_predator[index] = is_predator
+        self.radius[index] = PREDATOR_RADIUS if is_predator else AGENT_RADIUS
+        self.max_energy[index] = PREDATOR_ENERGY if is_predator else AGENT_ENERGY
+        self.max_speed[index] = PREDATOR_SPEED if is_predator else AGENT_SPEED
+        self.energy[index] = self.max_energy[index]
+        self.speed[index] = self.max_speed[index]
+
+    def reindex(self):
+        """Rebuild the active set from the alive flags"""
+        self.active = np.flatnonzero(self.alive)
+
+    def compact(self):
+        """Drop agents that died since the last call from the active set
+
+        `active` stays the same array when nobody died, so consumers can
+        tell cheaply that it hasn't changed.
+        """
+        living = self.alive[self.active]
+        if not living.all():
+            self.active = self.active[living]
+
+    def step(self, outputs, active=None, rows=None):
+        """Apply network outputs (size x NUM_OUTPUTS) to every active agent at once
+
+        Only living agents move; `active` is an optional boolean mask that
+        narrows that further. With `rows`, indices of living agents, only
+        those move and `outputs` has one row per entry of `rows`.
+        """
+        if rows is None:
+            mask = self.alive if active is None else self.alive & active
+            idx = np.flatnonzero(mask)
+            outputs = outputs[idx]
+        else:
+            idx = rows
+        if len(idx) == 0:
+            return
+        turn = outputs[:, 0]
+
+        # Update memory with current action
+        self.memory[idx, :-1] = self.memory[idx, 1:]
+        self.memory[idx, -1] = turn  # Store turning decision
+
+        # Update movement
+        angle = self.angle[idx] + (turn - 0.5) * np.pi
+        speed = outputs[:, 1] * self.max_speed[idx]
+
+        # Update position and keep agents within bounds
+        radius = self.radius[idx]
+        x = np.clip(self.x[idx] + np.cos(angle) * speed, radius, WINDOW_WIDTH - radius)
+        y = np.clip(self.y[idx] + np.sin(angle) * speed, radius, WINDOW_HEIGHT - radius)
+
+        # Decrease energy and check for deaths
+        energy = self.energy[idx] - ENERGY_DECAY
+
+        self.angle[idx] = angle
+        self.speed[idx] = speed
+        self.x[idx] = x
+        self.y[idx] = y
+        self.energy[idx] = energy
+        self.alive[idx] = energy > 0